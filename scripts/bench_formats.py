@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Vergleicht Renderzeit und Dateigröße von PNG und SVG über mehrere Breiten.
+
+Angegeben wird der Median über mehrere Läufe, nach einem Aufwärmlauf je
+Kombination (Font-Auflösung, Imports).
+
+  python scripts/bench_formats.py
+  python scripts/bench_formats.py --runs 10 --widths 1024 4096 --font "Fira Code"
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from title_image_service.generator import MEDIA_TYPES, generate_image
+from title_image_service.vector import has_outlines
+
+PAYLOAD = {
+    "titel": "Performance Engineering",
+    "text": "Vektor- und Rasterausgabe im Vergleich über mehrere Bildbreiten",
+    "titelzeilen": 2,
+}
+
+
+def measure(data: dict, runs: int) -> tuple[float, int]:
+    generate_image(data)
+    samples = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(generate_image(data))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--widths", type=int, nargs="+", default=[1024, 1920, 4096])
+    parser.add_argument("--font", default=None, help="Font (Default: wie der Service)")
+    args = parser.parse_args()
+
+    payload = dict(PAYLOAD, **({"font": args.font} if args.font else {}))
+    print(f"SVG-Glyphen als Pfade: {'ja' if has_outlines() else 'nein (fontTools fehlt)'}")
+    print(f"{'Breite':>6}  {'Format':<6} {'Median':>10} {'Größe':>12}")
+    for breite in args.widths:
+        for fmt in MEDIA_TYPES:
+            ms, size = measure(dict(payload, breite=breite, format=fmt), args.runs)
+            print(f"{breite:>6}  {fmt:<6} {ms:7.1f} ms {size / 1024:9.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
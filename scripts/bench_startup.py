@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Misst die Importzeit der Service-Module gegen ein Budget.
+
+Jeder Import läuft in einem frischen Interpreter; angegeben wird der Median
+über mehrere Läufe (nur die Importzeit, ohne Interpreter-Start).
+
+  python scripts/bench_startup.py
+  python scripts/bench_startup.py --runs 20 --budget-cli 80 --budget-app 500
+
+Exit-Code 1, wenn ein Budget überschritten wird.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+PROBE = (
+    "import sys, time; t = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure(module: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(float(out))
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-cli", type=float, default=100.0,
+                        help="Budget für title_image_service.cli in ms (Default: 100)")
+    parser.add_argument("--budget-app", type=float, default=800.0,
+                        help="Budget für title_image_service.main in ms (Default: 800)")
+    args = parser.parse_args()
+
+    targets = {
+        "title_image_service.cli":  args.budget_cli,
+        "title_image_service.main": args.budget_app,
+    }
+    over = 0
+    for module, budget in targets.items():
+        ms = measure(module, args.runs)
+        status = "OK  " if ms <= budget else "FAIL"
+        over += ms > budget
+        print(f"{status}  {module:<28} {ms:8.1f} ms  (Budget {budget:.0f} ms)")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
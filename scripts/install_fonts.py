@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Lädt Google Fonts in den Font-Cache herunter.
 
-Wird beim Docker-Build ausgeführt. Kann auch lokal genutzt werden:
+Wird beim Docker-Build ausgeführt. Kann auch lokal genutzt werden
+(setzt das installierte Paket voraus):
   FONT_CACHE_DIR=~/.cache/title-image-fonts python scripts/install_fonts.py
+
+Die Fonts werden im Manifest des Caches als gepinnt eingetragen und daher
+nie durch das Größenbudget (FONT_CACHE_MAX_BYTES) verdrängt.
 """
 import os
 import re
@@ -10,8 +14,11 @@ import sys
 import urllib.request
 from pathlib import Path
 
+from title_image_service.fontstore import FontStore
+
 CACHE = Path(os.getenv("FONT_CACHE_DIR", "/fonts-cache"))
 CACHE.mkdir(parents=True, exist_ok=True)
+STORE = FontStore(CACHE)
 
 UA = "Mozilla/5.0 (compatible; title-image-service/1.0)"
 
@@ -32,6 +39,5 @@ for cache_name, gf_name in FONTS.items():
         continue
     font_data = urllib.request.urlopen(urls[0], timeout=30).read()
     ext = ".otf" if urls[0].endswith(".otf") else ".ttf"
-    out = CACHE / (cache_name + ext)
-    out.write_bytes(font_data)
+    out = Path(STORE.add(cache_name, font_data, ext, pinned=True))
     print(f"OK  {out.name}  ({len(font_data):,} Bytes)")
@@ -10,12 +10,12 @@ logger = logging.getLogger(__name__)
 _KEYS_FILE = Path(os.environ.get("API_KEYS_FILE", "./api_keys.json"))
 
 
-def _load_keys() -> set[str]:
+def _load_keys(field: str = "keys") -> set[str]:
     """Liest api_keys.json bei jedem Aufruf neu ein."""
     try:
         with open(_KEYS_FILE, encoding="utf-8") as f:
             data = json.load(f)
-        return set(data.get("keys", []))
+        return set(data.get(field, []))
     except FileNotFoundError:
         logger.warning("API-Keys-Datei nicht gefunden: %s", _KEYS_FILE)
         return set()
@@ -61,3 +61,20 @@ async def verify_api_key(x_api_key: str | None = Header(None, alias="X-API-Key")
     if x_api_key not in valid_keys:
         raise HTTPException(status_code=401, detail="Ungültiger oder fehlender API-Key")
     return x_api_key
+
+
+async def verify_admin_key(x_api_key: str | None = Header(None, alias="X-API-Key")) -> str | None:
+    """FastAPI-Dependency für Admin-Endpunkte: prüft gegen `admin_keys`.
+
+    Ohne konfigurierte Admin-Keys ist der Zugriff nur erlaubt, wenn der
+    Service ausschließlich auf localhost lauscht. ALLOW_UNAUTHENTICATED
+    gilt hier bewusst nicht.
+    """
+    admin_keys = _load_keys("admin_keys")
+    if not admin_keys:
+        if _is_localhost_only():
+            return None
+        raise HTTPException(status_code=401, detail="Keine Admin-Keys konfiguriert.")
+    if x_api_key not in admin_keys:
+        raise HTTPException(status_code=401, detail="Ungültiger oder fehlender Admin-Key")
+    return x_api_key
@@ -0,0 +1,165 @@
+"""
+Offline-Stapelverarbeitung: rendert ein JSONL-Manifest parallel in ein Verzeichnis.
+
+Jede Zeile des Manifests ist ein JSON-Objekt mit denselben Feldern wie der
+Request-Body von POST /generate. Ausgabedateien heißen nach `dateiname` oder,
+falls leer, nach dem Inhalts-Hash der Parameter (`<hash>.png` bzw. `<hash>.svg`).
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import ValidationError
+
+from .generator import generate_image, warm_up
+from .logs import configure_worker_logging
+from .models import ImageRequest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    rendered: int = 0
+    skipped:  int = 0
+    failed:   int = 0
+    elapsed:  float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Gerenderte Bilder pro Sekunde."""
+        return self.rendered / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def iter_manifest(path: Path) -> Iterator[tuple[int, ImageRequest | None]]:
+    """Liest das Manifest zeilenweise; ungültige Zeilen liefern `None`."""
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield lineno, ImageRequest.model_validate(json.loads(line))
+            except (json.JSONDecodeError, ValidationError) as e:
+                logger.error("Manifest-Zeile %d ungültig: %s", lineno, e)
+                yield lineno, None
+
+
+def output_name(request: ImageRequest) -> str:
+    return request.dateiname or f"{request.content_hash()}.{request.format}"
+
+
+def _is_up_to_date(out_path: Path, request: ImageRequest, manifest_mtime: float) -> bool:
+    """Hash-benannte Dateien sind inhaltsadressiert und damit immer aktuell;
+    per `dateiname` benannte Dateien müssen neuer als das Manifest sein."""
+    try:
+        mtime = out_path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return not request.dateiname or mtime >= manifest_mtime
+
+
+def _init_worker() -> None:
+    configure_worker_logging()
+    warm_up()
+
+
+def _render_one(data: dict, out_path: str) -> str:
+    """Worker: rendert atomar über eine temporäre Datei im Zielverzeichnis."""
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        generate_image(data, tmp_path)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+def render_manifest(
+    manifest: Path,
+    out_dir: Path,
+    workers: int | None = None,
+    force: bool = False,
+) -> BatchResult:
+    """Rendert alle Einträge des Manifests über einen Prozess-Pool.
+
+    Das Manifest wird gestreamt; es sind höchstens `2 * workers` Aufträge
+    gleichzeitig in der Warteschlange, sodass auch sehr große Manifeste
+    mit konstantem Speicher verarbeitet werden. Stirbt ein Worker-Prozess
+    (z. B. durch den OOM-Killer), zählen die laufenden Aufträge als Fehler
+    und der Pool wird neu gestartet.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    manifest_mtime = manifest.stat().st_mtime
+    result = BatchResult()
+    # Ausgabename → (Inhalts-Hash, Manifest-Zeile) der ersten Verwendung
+    seen: dict[str, tuple[str, int]] = {}
+    start = time.perf_counter()
+
+    def collect(done) -> None:
+        for future in done:
+            lineno = pending.pop(future)
+            try:
+                future.result()
+                result.rendered += 1
+            except Exception as e:
+                logger.error("Manifest-Zeile %d: Fehler bei der Bildgenerierung: %s", lineno, e)
+                result.failed += 1
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    pending = {}
+    pool = new_pool()
+    try:
+        for lineno, request in iter_manifest(manifest):
+            if request is None:
+                result.failed += 1
+                continue
+            name = output_name(request)
+            out_path = out_dir / name
+            content_hash = request.content_hash()
+            if name in seen:
+                first_hash, first_line = seen[name]
+                if first_hash == content_hash:
+                    result.skipped += 1
+                else:
+                    logger.error(
+                        "Manifest-Zeile %d: Ausgabedatei %s ist bereits durch Zeile %d "
+                        "mit anderen Parametern belegt", lineno, name, first_line,
+                    )
+                    result.failed += 1
+                continue
+            seen[name] = (content_hash, lineno)
+            if not force and _is_up_to_date(out_path, request, manifest_mtime):
+                result.skipped += 1
+                continue
+
+            data = request.model_dump(exclude={"dateiname"})
+            try:
+                future = pool.submit(_render_one, data, str(out_path))
+            except BrokenProcessPool:
+                logger.error("Worker-Prozess abgebrochen (z. B. Speichermangel) – Pool wird neu gestartet")
+                collect(wait(pending).done)
+                pool.shutdown(wait=True)
+                pool = new_pool()
+                future = pool.submit(_render_one, data, str(out_path))
+            pending[future] = lineno
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(wait(pending).done)
+    finally:
+        pool.shutdown(wait=True)
+
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,140 @@
+"""
+Kommandozeile: `title-image-service [serve]` startet den HTTP-Server,
+`title-image-service render` rendert ein JSONL-Manifest offline,
+`title-image-service loadtest` misst /generate unter Last.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from .logs import configure_logging
+
+
+def _serve(args: argparse.Namespace) -> int:
+    import uvicorn
+
+    configure_logging("INFO")
+    uvicorn.run(
+        "title_image_service.main:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", 8000)),
+        reload=False,
+    )
+    return 0
+
+
+def _render(args: argparse.Namespace) -> int:
+    from .batch import render_manifest
+
+    configure_logging("WARNING")
+    result = render_manifest(
+        args.manifest,
+        Path(args.output),
+        workers=args.jobs,
+        force=args.force,
+    )
+    print(
+        f"Gerendert: {result.rendered}  Übersprungen: {result.skipped}  "
+        f"Fehler: {result.failed}  Dauer: {result.elapsed:.2f} s  "
+        f"({result.throughput:.1f} Bilder/s)"
+    )
+    return 1 if result.failed else 0
+
+
+def _loadtest(args: argparse.Namespace) -> int:
+    import json
+
+    from .loadtest import run_loadtest
+
+    configure_logging("WARNING")
+    report = run_loadtest(
+        url=args.url,
+        payloads=args.payloads,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        api_key=args.api_key or os.environ.get("API_KEY"),
+        threads=args.threads,
+        seed=args.seed,
+        labels=dict(args.label),
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+def _manifest_file(value: str) -> Path:
+    path = Path(value)
+    if not path.is_file():
+        raise argparse.ArgumentTypeError(f"Manifest nicht gefunden: {value}")
+    return path
+
+
+def _label(value: str) -> tuple[str, str]:
+    key, sep, label = value.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"erwartet KEY=VALUE, erhalten: {value!r}")
+    return key, label
+
+
+def _payloads_file(value: str) -> Path:
+    from .loadtest import load_payloads
+
+    path = Path(value)
+    try:
+        load_payloads(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return path
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="title-image-service",
+        description="Erzeugt 16:9-Titelbilder – als HTTP-Service oder offline.",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    serve = sub.add_parser("serve", help="HTTP-Server starten (Default)")
+    serve.set_defaults(func=_serve)
+
+    render = sub.add_parser("render", help="JSONL-Manifest offline rendern")
+    render.add_argument("manifest", type=_manifest_file, help="JSONL-Datei, ein Request-Objekt pro Zeile")
+    render.add_argument("-o", "--output", default=".", help="Zielverzeichnis (Default: .)")
+    render.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Anzahl Worker-Prozesse (Default: Anzahl CPUs)",
+    )
+    render.add_argument(
+        "-f", "--force", action="store_true",
+        help="Vorhandene Dateien neu rendern",
+    )
+    render.set_defaults(func=_render)
+
+    load = sub.add_parser("loadtest", help="Lasttest gegen /generate (JSON-Report)")
+    load.add_argument("--url", default=None, help="Ziel-URL; ohne Angabe in-process gegen die App")
+    load.add_argument("--payloads", type=_payloads_file, default=None, help="JSONL mit Request-Objekten, optional `_weight`")
+    load.add_argument("-n", "--requests", type=int, default=200, help="Anzahl Requests (Default: 200)")
+    load.add_argument("-c", "--concurrency", type=int, default=8, help="Parallele Clients (Default: 8)")
+    load.add_argument("--warmup", type=int, default=0, help="Requests vorab, nicht ausgewertet")
+    load.add_argument("--threads", type=int, default=None, help="Thread-Pool für asyncio.to_thread (nur in-process)")
+    load.add_argument("--api-key", default=None, help="X-API-Key (Default: $API_KEY)")
+    load.add_argument("--seed", type=int, default=0, help="Seed für die Payload-Auswahl")
+    load.add_argument(
+        "--label", type=_label, action="append", default=[], metavar="KEY=VALUE",
+        help="Beschriftung für den Report, mehrfach angebbar",
+    )
+    load.set_defaults(func=_loadtest)
+    return parser
+
+
+def run(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command is None:
+        return _serve(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(run())
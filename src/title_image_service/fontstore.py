@@ -0,0 +1,291 @@
+"""
+Font-Cache mit Manifest: Größenbudget, LRU-Verdrängung und Prüfsummen.
+
+Das Manifest (`manifest.json` im Cache-Verzeichnis) verzeichnet zu jedem Font
+Datei, SHA-256, Größe, Pin-Status und letzten Zugriff. Es dient zugleich als
+Index, sodass Lookups ohne Verzeichnis-Scan auskommen.
+
+- Zur Build-Zeit installierte Fonts (scripts/install_fonts.py) sind gepinnt
+  und werden nie verdrängt.
+- Zur Laufzeit geladene Fonts werden nach LRU gelöscht, sobald sie zusammen
+  FONT_CACHE_MAX_BYTES überschreiten.
+- Beim ersten Zugriff pro Prozess wird die Prüfsumme verifiziert; beschädigte
+  oder fehlende Dateien werden aus dem Cache entfernt.
+
+Mehrere Prozesse können sich ein Verzeichnis teilen: Änderungen am Manifest
+werden über dessen mtime erkannt; jedes Lesen-Ändern-Schreiben läuft unter
+einer Dateisperre (`.manifest.lock`, fcntl; ohne fcntl letzter Schreiber
+gewinnt). Fonts, die auf der Platte, aber nicht im Manifest liegen, werden
+beim Lookup übernommen.
+
+Auf dem Lesepfad ist das Schreiben des Manifests best effort: Ein nicht
+beschreibbares Verzeichnis (z. B. read-only gemountet) führt nur zu einer
+Warnung.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FONT_CACHE_MAX_BYTES = int(os.environ.get("FONT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".manifest.lock"
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc")
+
+# last_used wird höchstens in diesem Abstand (s) ins Manifest geschrieben
+_TOUCH_INTERVAL = 300
+
+
+def font_key(font_name: str) -> str:
+    return font_name.lower().replace(" ", "_")
+
+
+def _valid_fonts(manifest) -> dict[str, dict] | None:
+    """Font-Einträge des Manifests oder None, wenn die Struktur nicht stimmt."""
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("fonts", {}), dict):
+        return None
+    fonts = manifest.get("fonts", {})
+    for entry in fonts.values():
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("file"), str)
+            and Path(entry["file"]).name == entry["file"]
+            and isinstance(entry.get("sha256"), str)
+            and isinstance(entry.get("bytes"), int)
+            and isinstance(entry.get("pinned"), bool)
+            and isinstance(entry.get("last_used"), (int, float))
+        ):
+            return None
+    return fonts
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FontStore:
+    def __init__(self, directory: Path, max_bytes: int = FONT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.manifest_path = directory / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._fonts: dict[str, dict] = {}
+        self._manifest_mtime: float | None = None
+        self._verified: set[tuple[str, str]] = set()
+        self._last_saved: dict[str, float] = {}
+
+    # ─── Manifest ─────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _locked(self):
+        """Prozessübergreifende Sperre für Lesen-Ändern-Schreiben des Manifests."""
+        lock_file = None
+        if fcntl is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self.directory / LOCK_NAME, "a+b")
+            except OSError:
+                lock_file = None  # nicht beschreibbar – dann schreibt hier auch niemand
+        if lock_file is None:
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, force: bool = False) -> None:
+        """Lädt das Manifest, falls es von außen geändert wurde (force: immer)."""
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except FileNotFoundError:
+            if self._manifest_mtime is None:
+                self._adopt_existing()
+            return
+        if mtime == self._manifest_mtime and not force:
+            return
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                fonts = _valid_fonts(json.load(f))
+            if fonts is None:
+                raise ValueError("unerwartete Struktur")
+        except (ValueError, OSError) as e:
+            logger.warning("Font-Manifest unlesbar (%s), wird neu aufgebaut", e)
+            self._fonts = {}
+            self._adopt_existing()
+            return
+        self._manifest_mtime = mtime
+        self._last_saved = {k: e["last_used"] for k, e in fonts.items()}
+        # Noch nicht geschriebene Zugriffe dieses Prozesses nicht verlieren
+        for key, entry in fonts.items():
+            mine = self._fonts.get(key)
+            if mine is not None and mine["sha256"] == entry["sha256"]:
+                entry["last_used"] = max(entry["last_used"], mine["last_used"])
+        self._fonts = fonts
+
+    def _adopt_existing(self) -> None:
+        """Übernimmt Fonts aus einem Cache ohne Manifest (einmaliger Scan)."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path in self.directory.iterdir():
+                if path.suffix.lower() in FONT_SUFFIXES and path.stem not in self._fonts:
+                    self._fonts[path.stem] = self._entry(path)
+            self._save()
+        except OSError as e:
+            logger.warning("Font-Manifest nicht schreibbar (%s)", e)
+            # Kein erneuter Scan bei jedem Lookup
+            self._manifest_mtime = 0.0
+
+    @staticmethod
+    def _entry(path: Path) -> dict:
+        return {
+            "file": path.name,
+            "sha256": _sha256(path),
+            "bytes": path.stat().st_size,
+            "pinned": False,
+            "last_used": time.time(),
+        }
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "fonts": self._fonts}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+        self._manifest_mtime = self.manifest_path.stat().st_mtime
+        self._last_saved = {k: e["last_used"] for k, e in self._fonts.items()}
+
+    def _write(self, mutate: Callable[[], None]) -> None:
+        """Manifest-Änderung vom Lesepfad: unter Sperre, Fehler nur als Warnung."""
+        try:
+            with self._locked():
+                self._refresh(force=True)
+                mutate()
+                self._save()
+        except OSError as e:
+            logger.warning("Font-Manifest nicht schreibbar (%s)", e)
+            self._last_saved = {k: e["last_used"] for k, e in self._fonts.items()}
+
+    # ─── Zugriff ──────────────────────────────────────────────────────────────
+
+    def lookup(self, font_name: str) -> str | None:
+        """Pfad eines gecachten Fonts oder None; verifiziert die Prüfsumme."""
+        key = font_key(font_name)
+        with self._lock:
+            self._refresh()
+            entry = self._fonts.get(key)
+            if entry is None:
+                return self._adopt_orphan(key)
+            path = self.directory / entry["file"]
+            if (key, entry["sha256"]) not in self._verified:
+                try:
+                    ok = _sha256(path) == entry["sha256"]
+                except OSError:
+                    ok = False
+                if not ok:
+                    logger.warning("Font '%s' fehlt oder ist beschädigt – wird verworfen", entry["file"])
+                    self._fonts.pop(key, None)
+                    self._write(lambda: self._discard(key))
+                    return None
+                self._verified.add((key, entry["sha256"]))
+
+            now = entry["last_used"] = time.time()
+            if now - self._last_saved.get(key, 0) >= _TOUCH_INTERVAL:
+                self._write(lambda: self._fonts.get(key, {}).update(last_used=now))
+            return str(path)
+
+    def _adopt_orphan(self, key: str) -> str | None:
+        """Übernimmt einen Font, der auf der Platte, aber nicht im Manifest liegt."""
+        for suffix in FONT_SUFFIXES:
+            path = self.directory / f"{key}{suffix}"
+            if path.is_file():
+                break
+        else:
+            return None
+        try:
+            entry = self._entry(path)
+        except OSError:
+            return None
+        logger.info("Font-Cache: übernehme %s ins Manifest", path.name)
+        self._fonts[key] = entry
+        self._verified.add((key, entry["sha256"]))
+        self._write(lambda: self._fonts.setdefault(key, entry))
+        return str(path)
+
+    def add(self, font_name: str, data: bytes, ext: str, pinned: bool = False) -> str:
+        """Legt einen Font ab und verdrängt bei Bedarf alte Laufzeit-Downloads."""
+        key = font_key(font_name)
+        path = self.directory / f"{key}{ext}"
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock, self._locked():
+            self._refresh(force=True)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+            old = self._fonts.get(key)
+            if old is not None and old["file"] != path.name:
+                (self.directory / old["file"]).unlink(missing_ok=True)
+            self._fonts[key] = {
+                "file": path.name,
+                "sha256": digest,
+                "bytes": len(data),
+                "pinned": pinned or bool(old and old["pinned"]),
+                "last_used": time.time(),
+            }
+            self._verified.add((key, digest))
+            self._evict(keep=key)
+            self._save()
+        return str(path)
+
+    def _discard(self, key: str) -> None:
+        entry = self._fonts.pop(key, None)
+        if entry is not None:
+            (self.directory / entry["file"]).unlink(missing_ok=True)
+
+    def _evict(self, keep: str) -> None:
+        runtime = sorted(
+            (e["last_used"], k) for k, e in self._fonts.items() if not e["pinned"]
+        )
+        total = sum(self._fonts[k]["bytes"] for _, k in runtime)
+        for _, key in runtime:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._fonts[key]["bytes"]
+            logger.info("Font-Cache: verdränge %s", self._fonts[key]["file"])
+            self._discard(key)
+
+
+_stores: dict[Path, FontStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: Path) -> FontStore:
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = FontStore(directory)
+        return store
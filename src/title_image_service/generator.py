@@ -2,18 +2,27 @@
 Bildgenerator – Kern aus generate.py übernommen.
 generate_image() kann Bilddaten als bytes zurückgeben (output_path=None)
 oder in eine Datei speichern.
+
+Pillow, urllib und subprocess werden erst bei Bedarf importiert (oder per
+warm_up() vorab), damit Server-, CLI- und Worker-Start schnell bleiben.
 """
 
+from __future__ import annotations
+
 import io
 import logging
 import os
 import re
-import subprocess
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from PIL import Image, ImageDraw, ImageFont
-import urllib.request
-import urllib.error
+from .fontstore import get_store
+from .logs import detail
+
+if TYPE_CHECKING:
+    from PIL import ImageDraw, ImageFont
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +36,11 @@ DEFAULTS = {
     "breite": 1024,
     "font": "Rubik Glitch",
     "titelzeilen": 1,
+    "format": "png",
 }
 
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
 FONT_CACHE_DIR = Path(
     os.environ.get("FONT_CACHE_DIR", Path.home() / ".cache" / "title-image-fonts")
 )
@@ -69,6 +81,8 @@ def normalize_color(color: str) -> str:
 
 
 def http_get(url: str, timeout: int = 15) -> bytes:
+    import urllib.request
+
     req = urllib.request.Request(
         url,
         headers={"User-Agent": "Mozilla/5.0 (compatible; title-image-skill/1.0)"}
@@ -80,6 +94,8 @@ def http_get(url: str, timeout: int = 15) -> bytes:
 # ─── Font-Auflösung ───────────────────────────────────────────────────────────
 
 def try_system_font(font_name: str) -> str | None:
+    import subprocess
+
     try:
         family_result = subprocess.run(
             ["fc-match", "--format=%{family}", font_name],
@@ -100,19 +116,22 @@ def try_system_font(font_name: str) -> str | None:
 
 
 def try_cache(font_name: str) -> str | None:
-    FONT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    key = font_name.lower().replace(" ", "_")
-    for f in FONT_CACHE_DIR.glob(f"{key}*"):
-        return str(f)
-    return None
+    try:
+        return get_store(FONT_CACHE_DIR).lookup(font_name)
+    except OSError as e:
+        logger.warning("Font-Cache nicht lesbar: %s", e)
+        return None
 
 
 def try_google_fonts(font_name: str) -> str | None:
+    import urllib.error
+    import urllib.request
+
     gf_name = font_name.replace(" ", "+")
     css_url = f"https://fonts.googleapis.com/css2?family={gf_name}&display=swap"
 
     try:
-        logger.info("Google Fonts: %s", css_url)
+        detail(logger, "Google Fonts: %s", css_url)
         req = urllib.request.Request(
             css_url,
             headers={"User-Agent": "Mozilla/5.0 (compatible; title-image-service/1.0)"}
@@ -125,16 +144,13 @@ def try_google_fonts(font_name: str) -> str | None:
             return None
 
         font_url = urls[0]
-        logger.info("Lade Font herunter: %s", font_url)
+        detail(logger, "Lade Font herunter: %s", font_url)
         font_data = http_get(font_url)
 
-        FONT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         ext = ".otf" if font_url.endswith(".otf") else ".ttf"
-        cache_name = font_name.lower().replace(" ", "_") + ext
-        cache_path = FONT_CACHE_DIR / cache_name
-        cache_path.write_bytes(font_data)
+        cache_path = get_store(FONT_CACHE_DIR).add(font_name, font_data, ext)
         logger.info("Font gecacht: %s", cache_path)
-        return str(cache_path)
+        return cache_path
 
     except (urllib.error.URLError, urllib.error.HTTPError, OSError) as e:
         logger.warning("Google Fonts fehlgeschlagen: %s", e)
@@ -142,30 +158,39 @@ def try_google_fonts(font_name: str) -> str | None:
 
 
 def resolve_font(font_name: str) -> tuple[str | None, str]:
-    logger.info("Suche Font: '%s'", font_name)
+    path, name, _ = resolve_font_source(font_name)
+    return path, name
+
+
+def resolve_font_source(font_name: str) -> tuple[str | None, str, str]:
+    """Wie resolve_font, zusätzlich mit der Quelle des Fonts
+    ("system", "cache", "google", "fallback" oder "default")."""
+    detail(logger, "Suche Font: '%s'", font_name)
 
     path = try_system_font(font_name)
     if path:
-        logger.info("System-Font gefunden: %s", path)
-        return path, font_name
+        detail(logger, "System-Font gefunden: %s", path)
+        return path, font_name, "system"
 
     path = try_cache(font_name)
     if path:
-        logger.info("Cache-Font gefunden: %s", path)
-        return path, font_name
+        detail(logger, "Cache-Font gefunden: %s", path)
+        return path, font_name, "cache"
 
-    logger.info("Versuche Google Fonts…")
+    detail(logger, "Versuche Google Fonts…")
     path = try_google_fonts(font_name)
     if path:
-        logger.info("Von Google Fonts heruntergeladen: %s", path)
-        return path, font_name
+        detail(logger, "Von Google Fonts heruntergeladen: %s", path)
+        return path, font_name, "google"
+
+    import subprocess
 
     logger.warning("Font '%s' nicht verfügbar. Verwende Systemfallback.", font_name)
     for fallback_path in SYSTEM_FALLBACKS:
         if Path(fallback_path).exists():
             name = Path(fallback_path).stem
-            logger.info("Fallback: %s (%s)", name, fallback_path)
-            return fallback_path, name
+            detail(logger, "Fallback: %s (%s)", name, fallback_path)
+            return fallback_path, name, "fallback"
 
     try:
         result = subprocess.run(
@@ -174,13 +199,13 @@ def resolve_font(font_name: str) -> tuple[str | None, str]:
         )
         path = result.stdout.strip()
         if path and Path(path).exists():
-            logger.info("fc-match Fallback: %s", path)
-            return path, Path(path).stem
+            detail(logger, "fc-match Fallback: %s", path)
+            return path, Path(path).stem, "fallback"
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
 
     logger.warning("Kein Font gefunden – verwende PIL-Standardfont.")
-    return None, "PIL Default"
+    return None, "PIL Default", "default"
 
 
 # ─── Textumbruch ──────────────────────────────────────────────────────────────
@@ -208,13 +233,51 @@ def wrap_text(text: str, font: ImageFont.FreeTypeFont | ImageFont.ImageFont, max
 
 # ─── Bildgenerierung ──────────────────────────────────────────────────────────
 
-def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
+def warm_up() -> None:
+    """Lädt Pillow samt PNG-Encoder und Standardfont vorab.
+
+    Für Server-Start und Worker-Prozesse gedacht, damit der erste Request
+    nicht die Importkosten trägt.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new("RGB", (16, 9))
+    ImageDraw.Draw(img).text((0, 0), "Ag", font=ImageFont.load_default())
+    img.save(io.BytesIO(), "PNG")
+
+
+STAGES = ("font", "fit", "wrap", "draw", "encode")
+
+
+class _StageTimer:
+    """Summiert die Dauer der Render-Phasen in Millisekunden."""
+
+    def __init__(self):
+        self.timings: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+
+    @contextmanager
+    def __call__(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += (time.perf_counter() - start) * 1000
+
+
+def generate_image(data: dict, output_path: str | None = None, stats: dict | None = None) -> bytes | str:
     """
     Erzeugt ein 16:9-Titelbild.
 
-    - output_path=None  → gibt PNG-Bilddaten als bytes zurück
+    - output_path=None  → gibt Bilddaten (PNG oder SVG, je nach "format") als bytes zurück
     - output_path=<str> → speichert in Datei, gibt Pfad zurück
+    - stats=<dict>      → erhält "timings" (ms je Phase), "font", "font_source"
+                          und bei bytes-Rückgabe "bytes"
     """
+    from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+    stage = _StageTimer()
+    if stats is not None:
+        stats["timings"] = stage.timings
     config = {**DEFAULTS, **data}
 
     titel       = config["titel"]
@@ -224,12 +287,20 @@ def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
     breite      = int(config["breite"])
     font_name   = config["font"]
     titelzeilen = max(1, int(config["titelzeilen"]))
+    fmt         = str(config["format"]).lower()
     hoehe       = int(breite * 9 / 16)
 
-    logger.info("Bildgröße: %dx%dpx (16:9)", breite, hoehe)
-    logger.info("Farben: FG=%s  BG=%s", fg_color, bg_color)
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+
+    detail(logger, "Bildgröße: %dx%dpx (16:9)", breite, hoehe)
+    detail(logger, "Farben: FG=%s  BG=%s", fg_color, bg_color)
 
-    font_path, resolved_name = resolve_font(font_name)
+    with stage("font"):
+        font_path, resolved_name, font_source = resolve_font_source(font_name)
+    if stats is not None:
+        stats["font"] = resolved_name
+        stats["font_source"] = font_source
 
     target_titel_w = int(breite * 0.80)
     padding_h      = int(breite * 0.08)
@@ -243,8 +314,10 @@ def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
                 logger.warning("Fehler beim Laden des Fonts (%s), PIL-Standard.", e)
         return ImageFont.load_default()
 
-    img  = Image.new("RGB", (breite, hoehe), color=bg_color)
-    draw = ImageDraw.Draw(img)
+    # Messungen brauchen keine Bildfläche; sie entsteht erst im Raster-Backend
+    fg_rgb = ImageColor.getrgb(fg_color)
+    bg_rgb = ImageColor.getrgb(bg_color)
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
 
     def fit_font_to_width(text_str: str, target_w: int, size_min=8, size_max=1000):
         lo, hi, best_size = size_min, size_max, size_min
@@ -285,21 +358,23 @@ def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
             i = end
         return [l for l in lines if l]
 
-    if titel:
-        titel_lines_raw = split_title(titel, titelzeilen)
-        longest_line = max(titel_lines_raw, key=len)
-        titel_font, titel_size = fit_font_to_width(longest_line, target_titel_w)
-    else:
-        titel_lines_raw = []
-        titel_size = max(12, int(breite * 0.07))
-        titel_font = load_font(titel_size)
+    with stage("fit"):
+        if titel:
+            titel_lines_raw = split_title(titel, titelzeilen)
+            longest_line = max(titel_lines_raw, key=len)
+            titel_font, titel_size = fit_font_to_width(longest_line, target_titel_w)
+        else:
+            titel_lines_raw = []
+            titel_size = max(12, int(breite * 0.07))
+            titel_font = load_font(titel_size)
 
-    text_size = max(10, int(titel_size * 0.40))
-    text_font = load_font(text_size)
-    gap       = max(10, int(titel_size * 0.30))
+        text_size = max(10, int(titel_size * 0.40))
+        text_font = load_font(text_size)
+        gap       = max(10, int(titel_size * 0.30))
 
     titel_lines = titel_lines_raw
-    text_lines  = wrap_text(text, text_font, max_text_w, draw) if text else []
+    with stage("wrap"):
+        text_lines = wrap_text(text, text_font, max_text_w, draw) if text else []
 
     def block_height(lines, font, leading=1.3):
         if not lines:
@@ -307,27 +382,33 @@ def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
         bbox = draw.textbbox((0, 0), "Ag", font=font)
         return int((bbox[3] - bbox[1]) * leading) * len(lines)
 
-    total_h = (block_height(titel_lines, titel_font)
-               + (gap if titel_lines and text_lines else 0)
-               + block_height(text_lines, text_font))
+    with stage("fit"):
+        total_h = (block_height(titel_lines, titel_font)
+                   + (gap if titel_lines and text_lines else 0)
+                   + block_height(text_lines, text_font))
 
     # Skalierung wenn Gesamtblock die Bildhöhe übersteigt
     _target_h = int(hoehe * 0.85)
     if total_h > _target_h > 0:
-        scale      = _target_h / total_h
-        titel_size = max(8, int(titel_size * scale))
-        titel_font = load_font(titel_size)
-        text_size  = max(10, int(titel_size * 0.40))
-        text_font  = load_font(text_size)
-        gap        = max(10, int(titel_size * 0.30))
-        text_lines = wrap_text(text, text_font, max_text_w, draw) if text else []
-        total_h    = (block_height(titel_lines, titel_font)
-                      + (gap if titel_lines and text_lines else 0)
-                      + block_height(text_lines, text_font))
+        with stage("fit"):
+            scale      = _target_h / total_h
+            titel_size = max(8, int(titel_size * scale))
+            titel_font = load_font(titel_size)
+            text_size  = max(10, int(titel_size * 0.40))
+            text_font  = load_font(text_size)
+            gap        = max(10, int(titel_size * 0.30))
+        with stage("wrap"):
+            text_lines = wrap_text(text, text_font, max_text_w, draw) if text else []
+        with stage("fit"):
+            total_h    = (block_height(titel_lines, titel_font)
+                          + (gap if titel_lines and text_lines else 0)
+                          + block_height(text_lines, text_font))
 
     y = (hoehe - total_h) // 2
 
-    def draw_lines(lines, font, leading=1.3):
+    placed = []
+
+    def place_lines(lines, font, leading=1.3):
         nonlocal y
         if not lines:
             return
@@ -336,20 +417,46 @@ def generate_image(data: dict, output_path: str | None = None) -> bytes | str:
         for line in lines:
             bbox = draw.textbbox((0, 0), line, font=font)
             x = (breite - (bbox[2] - bbox[0])) // 2
-            draw.text((x, y), line, font=font, fill=fg_color)
+            placed.append((line, font, x, y))
             y += line_h
 
-    draw_lines(titel_lines, titel_font)
-    if titel_lines and text_lines:
-        y += gap
-    draw_lines(text_lines, text_font)
-
-    if output_path is None:
-        buf = io.BytesIO()
-        img.save(buf, "PNG")
-        logger.info("Bild erzeugt (%d Bytes)", buf.tell())
-        return buf.getvalue()
-    else:
-        img.save(output_path, "PNG")
-        logger.info("Gespeichert: %s", output_path)
-        return output_path
+    with stage("fit"):
+        place_lines(titel_lines, titel_font)
+        if titel_lines and text_lines:
+            y += gap
+        place_lines(text_lines, text_font)
+
+    if fmt == "svg":
+        from .vector import render_svg
+
+        with stage("draw"):
+            svg = render_svg(breite, hoehe, fg_rgb, bg_rgb, font_path, placed)
+        with stage("encode"):
+            out = svg.encode("utf-8")
+            if output_path is None:
+                detail(logger, "Bild erzeugt (%d Bytes)", len(out))
+                if stats is not None:
+                    stats["bytes"] = len(out)
+                return out
+            Path(output_path).write_bytes(out)
+            detail(logger, "Gespeichert: %s", output_path)
+            return output_path
+
+    with stage("draw"):
+        img    = Image.new("RGB", (breite, hoehe), color=bg_rgb)
+        canvas = ImageDraw.Draw(img)
+        for line, font, x, line_y in placed:
+            canvas.text((x, line_y), line, font=font, fill=fg_rgb)
+
+    with stage("encode"):
+        if output_path is None:
+            buf = io.BytesIO()
+            img.save(buf, "PNG")
+            detail(logger, "Bild erzeugt (%d Bytes)", buf.tell())
+            if stats is not None:
+                stats["bytes"] = buf.tell()
+            return buf.getvalue()
+        else:
+            img.save(output_path, "PNG")
+            detail(logger, "Gespeichert: %s", output_path)
+            return output_path
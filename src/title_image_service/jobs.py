@@ -0,0 +1,306 @@
+"""
+Asynchrone Render-Jobs: persistente Warteschlange (SQLite) plus Worker-Threads.
+
+POST /jobs legt einen Job an und antwortet sofort; Worker-Threads arbeiten die
+Warteschlange ab und legen das Ergebnis als Datei in JOBS_DIR ab. Fertige Jobs
+verfallen nach JOBS_TTL Sekunden; übersteigen die Ergebnisse JOBS_MAX_BYTES,
+werden die ältesten zuerst gelöscht.
+
+Mehrere Prozesse (uvicorn --workers, Replikas auf einem gemeinsamen Volume)
+können dieselbe Warteschlange nutzen: Ein übernommener Job gehört dem Prozess,
+der ihn beansprucht hat, solange dessen Lease (JOBS_LEASE Sekunden) laufend
+erneuert wird. Erst nach Ablauf der Lease – etwa weil der Prozess beendet
+wurde – wird der Job erneut eingereiht.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+from . import logs
+from .generator import generate_image
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = Path(
+    os.environ.get("JOBS_DIR", Path.home() / ".cache" / "title-image-jobs")
+)
+JOBS_WORKERS   = int(os.environ.get("JOBS_WORKERS", "2"))
+JOBS_TTL       = int(os.environ.get("JOBS_TTL", "3600"))
+JOBS_MAX_BYTES = int(os.environ.get("JOBS_MAX_BYTES", str(512 * 1024 * 1024)))
+JOBS_LEASE     = float(os.environ.get("JOBS_LEASE", "60"))
+
+# Wartezeit eines untätigen Workers, bevor er die Datenbank erneut abfragt
+_POLL_INTERVAL = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    status   TEXT NOT NULL,
+    params   TEXT NOT NULL,
+    created  REAL NOT NULL,
+    finished REAL,
+    bytes    INTEGER,
+    error    TEXT,
+    owner    TEXT,
+    lease    REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+
+class JobQueue:
+    """Dateibasierte Job-Warteschlange; sicher über Threads und Prozesse.
+
+    Jede Instanz hat eine eigene Kennung (`owner`), unter der sie Jobs
+    beansprucht und deren Leases erneuert.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl: int = JOBS_TTL,
+        max_bytes: int = JOBS_MAX_BYTES,
+        lease: float = JOBS_LEASE,
+    ):
+        self.directory = directory
+        self.results = directory / "results"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lease = lease
+        self.owner = uuid.uuid4().hex
+        self.wakeup = threading.Event()
+        self.results.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            columns = {r["name"] for r in db.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease", "REAL")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.directory / "jobs.sqlite3", timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def result_path(self, job_id: str) -> Path:
+        # Ohne Endung: das Format (PNG/SVG) steht in den Job-Parametern
+        return self.results / job_id
+
+    def submit(self, params: dict) -> str:
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, params, created) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), time.time()),
+            )
+        self.wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        if job["finished"] is not None and job["finished"] < time.time() - self.ttl:
+            return None
+        return job
+
+    def claim(self) -> tuple[str, dict] | None:
+        """Übernimmt den ältesten wartenden Job oder einen mit abgelaufener Lease (atomar)."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = db.execute(
+                "SELECT id, params FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND (lease IS NULL OR lease < ?)) "
+                "ORDER BY created LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease = ? WHERE id = ?",
+                (self.owner, now + self.lease, row["id"]),
+            )
+            db.execute("COMMIT")
+            return row["id"], json.loads(row["params"])
+        except BaseException:
+            # Scheitert schon BEGIN (z. B. "database is locked"), gibt es nichts
+            # zurückzurollen – ein ROLLBACK würde den eigentlichen Fehler verdecken
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def complete(self, job_id: str, data: bytes) -> None:
+        path = self.result_path(job_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with closing(self._connect()) as db:
+            db.execute(
+                "UPDATE jobs SET status = 'done', finished = ?, bytes = ? WHERE id = ?",
+                (time.time(), len(data), job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with closing(self._connect()) as db:
+            db.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, error = ? WHERE id = ?",
+                (time.time(), error, job_id),
+            )
+
+    def renew(self) -> None:
+        """Verlängert die Leases aller Jobs, die diese Instanz gerade rendert."""
+        with closing(self._connect()) as db:
+            db.execute(
+                "UPDATE jobs SET lease = ? WHERE status = 'running' AND owner = ?",
+                (time.time() + self.lease, self.owner),
+            )
+
+    def recover(self) -> int:
+        """Reiht Jobs erneut ein, deren Lease abgelaufen ist (z. B. nach einem Absturz).
+
+        Jobs, die ein anderer lebender Prozess gerade rendert, bleiben unberührt.
+        """
+        with closing(self._connect()) as db:
+            count = db.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease = NULL "
+                "WHERE status = 'running' AND (lease IS NULL OR lease < ?)",
+                (time.time(),),
+            ).rowcount
+        if count:
+            logger.info("%d unterbrochene Jobs erneut eingereiht", count)
+            self.wakeup.set()
+        return count
+
+    def cleanup(self) -> None:
+        """Löscht abgelaufene Jobs und hält die Ergebnisse unter max_bytes."""
+        expired_before = time.time() - self.ttl
+        with closing(self._connect()) as db:
+            expired = [r["id"] for r in db.execute(
+                "SELECT id FROM jobs WHERE finished IS NOT NULL AND finished < ?",
+                (expired_before,),
+            )]
+            total = 0
+            for row in db.execute(
+                "SELECT id, bytes FROM jobs WHERE status = 'done' AND finished >= ? "
+                "ORDER BY finished DESC",
+                (expired_before,),
+            ):
+                total += row["bytes"]
+                if total > self.max_bytes:
+                    expired.append(row["id"])
+            for job_id in expired:
+                db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                self.result_path(job_id).unlink(missing_ok=True)
+        if expired:
+            logger.info("%d Job-Ergebnisse entfernt", len(expired))
+
+
+class JobWorkers:
+    """Thread-Pool, der eine JobQueue abarbeitet, plus Heartbeat für die Leases.
+
+    Der Heartbeat räumt auch regelmäßig auf, sodass TTL und Größenlimit ohne
+    neue Jobs greifen. Ergebnisse entstehen nur in Prozessen mit Workern; deren
+    Heartbeat deckt damit auch ein geteiltes JOBS_DIR ab.
+    """
+
+    def __init__(self, queue: JobQueue, count: int = JOBS_WORKERS):
+        self.queue = queue
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            for i in range(count)
+        ]
+        self._threads.append(
+            threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        )
+
+    def start(self) -> None:
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.queue.wakeup.set()
+        for t in self._threads:
+            t.join()
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.queue.lease / 3):
+            try:
+                self.queue.renew()
+            except Exception as e:
+                logger.warning("Job-Leases nicht erneuert: %s", e)
+            try:
+                self.queue.cleanup()
+            except Exception as e:
+                logger.warning("Job-Aufräumen fehlgeschlagen: %s", e)
+
+    def _run(self) -> None:
+        # Fehler der Warteschlange (z. B. "database is locked", volle Platte)
+        # beenden nie den Thread; ein liegengebliebener Job wird nach Ablauf
+        # seiner Lease erneut übernommen.
+        while not self._stop.is_set():
+            try:
+                busy = self._step()
+            except Exception as e:
+                logger.exception("Job-Worker: Fehler in der Warteschlange: %s", e)
+                self._stop.wait(_POLL_INTERVAL)
+                continue
+            if not busy:
+                self.queue.wakeup.wait(_POLL_INTERVAL)
+                self.queue.wakeup.clear()
+
+    def _step(self) -> bool:
+        """Bearbeitet einen Job; False, wenn keiner wartet."""
+        claimed = self.queue.claim()
+        if claimed is None:
+            return False
+        job_id, params = claimed
+        stats: dict = {}
+        status = 200
+        start = time.perf_counter()
+        with logs.sample_verbose() as verbose:
+            try:
+                data = generate_image(params, None, stats)
+                self.queue.complete(job_id, data)
+            except Exception as e:
+                logger.exception("Job %s fehlgeschlagen: %s", job_id, e)
+                status = 422 if isinstance(e, (ValueError, OSError)) else 500
+                try:
+                    self.queue.fail(job_id, str(e))
+                except Exception as fail_error:
+                    logger.error("Job %s konnte nicht als fehlgeschlagen markiert werden: %s", job_id, fail_error)
+            finally:
+                total_ms = (time.perf_counter() - start) * 1000
+                logs.render_summary(logger, "/jobs", status, total_ms, params, stats, verbose, job=job_id)
+        try:
+            self.queue.cleanup()
+        except Exception as e:
+            logger.warning("Job-Aufräumen fehlgeschlagen: %s", e)
+        return True
+
+
+_queue: JobQueue | None = None
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue(JOBS_DIR)
+    return _queue
@@ -0,0 +1,194 @@
+"""
+Lasttest für POST /generate – in-process gegen die ASGI-App oder gegen eine URL.
+
+Erfasst Warteschlangeneffekte von asyncio.to_thread und der Auth-Dependency,
+die ein Micro-Benchmark von generate_image() nicht zeigt. Das Ergebnis ist
+ein JSON-Report mit Durchsatz, Latenz-Perzentilen, Fehlerquote, mittleren
+Server-Timing-Phasen und der relevanten Konfiguration, damit Läufe mit
+unterschiedlichen Einstellungen vergleichbar sind.
+
+Benötigt httpx (im `dev`-Extra enthalten).
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Standard-Mix: überwiegend typische Größen, einige große Renderings
+DEFAULT_MIX = [
+    ({"titel": "NIS2 Compliance", "breite": 1024}, 5),
+    ({"titel": "DORA in der Praxis", "text": "Was Finanzunternehmen jetzt tun müssen", "breite": 1920, "titelzeilen": 2}, 3),
+    ({"titel": "Zero Trust", "text": "Architektur, Betrieb und typische Fallstricke", "breite": 4096}, 1),
+]
+
+# Umgebungsvariablen, die Renderzeiten beeinflussen und im Report landen
+CONFIG_ENV = ("WARMUP", "FONT_CACHE_DIR", "PROFILE_SAMPLE_RATE", "PROFILE_SLOW_MS")
+
+
+def load_payloads(path: Path) -> list[tuple[dict, float]]:
+    """JSONL mit Request-Objekten; optionales Feld `_weight` (Default 1).
+
+    ValueError bei ungültigen Zeilen oder einer Datei ohne Requests.
+    """
+    mix = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                payload = json.loads(line)
+                if not isinstance(payload, dict):
+                    raise ValueError(f"Zeile {number}: kein JSON-Objekt")
+                mix.append((payload, float(payload.pop("_weight", 1))))
+    if not mix:
+        raise ValueError(f"{path} enthält keine Requests")
+    return mix
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Perzentil nach Nearest-Rank-Methode."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _parse_server_timing(header: str) -> dict[str, float]:
+    timings = {}
+    for part in header.split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if dur:
+            timings[name] = float(dur)
+    return timings
+
+
+async def _run(client, mix, total: int, concurrency: int, api_key: str | None, seed: int) -> dict:
+    rng = random.Random(seed)
+    payloads, weights = zip(*mix)
+    schedule = iter(rng.choices(payloads, weights=weights, k=total))
+    headers = {"X-API-Key": api_key} if api_key else {}
+
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    stage_sums: dict[str, float] = defaultdict(float)
+    stage_counts: Counter[str] = Counter()
+
+    async def worker():
+        for payload in schedule:
+            start = time.perf_counter()
+            try:
+                resp = await client.post("/generate", json=payload, headers=headers)
+                status = str(resp.status_code)
+            except Exception as e:
+                resp, status = None, type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] += 1
+            if resp is not None and "server-timing" in resp.headers:
+                for name, ms in _parse_server_timing(resp.headers["server-timing"]).items():
+                    stage_sums[name] += ms
+                    stage_counts[name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": errors / len(latencies) if latencies else 0.0,
+        "status": dict(statuses),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "server_timing_mean_ms": {
+            name: round(stage_sums[name] / stage_counts[name], 2) for name in stage_sums
+        },
+    }
+
+
+def _client(url: str | None):
+    import httpx
+
+    timeout = httpx.Timeout(300.0)
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+    from .main import app
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout,
+    )
+
+
+@asynccontextmanager
+async def _app_running(url: str | None):
+    """In-process: Lifespan der App wie unter uvicorn (u. a. WARMUP), aber ohne
+    Job-Worker. ASGITransport allein sendet keine Lifespan-Events."""
+    if url:
+        yield
+        return
+    from . import jobs
+    from .main import app
+
+    saved = jobs.JOBS_WORKERS
+    jobs.JOBS_WORKERS = 0
+    try:
+        async with app.router.lifespan_context(app):
+            yield
+    finally:
+        jobs.JOBS_WORKERS = saved
+
+
+def run_loadtest(
+    url: str | None = None,
+    payloads: Path | None = None,
+    requests: int = 200,
+    concurrency: int = 8,
+    warmup: int = 0,
+    api_key: str | None = None,
+    threads: int | None = None,
+    seed: int = 0,
+    labels: dict[str, str] | None = None,
+) -> dict:
+    """Führt einen Lasttest aus und gibt den Report als dict zurück.
+
+    - url=None     → in-process gegen die ASGI-App
+    - threads=<N>  → Größe des Thread-Pools für asyncio.to_thread (nur in-process)
+    - warmup=<N>   → N Requests vorab, die nicht in die Auswertung eingehen
+    """
+    if importlib.util.find_spec("httpx") is None:
+        raise RuntimeError("Lasttest benötigt httpx: pip install httpx")
+
+    mix = load_payloads(payloads) if payloads else DEFAULT_MIX
+
+    async def main() -> dict:
+        # asyncio.to_thread nutzt den Default-Executor des Loops
+        if threads and not url:
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+        async with _app_running(url), _client(url) as client:
+            if warmup:
+                await _run(client, mix, warmup, concurrency, api_key, seed + 1)
+            return await _run(client, mix, requests, concurrency, api_key, seed)
+
+    report = asyncio.run(main())
+    report["config"] = {
+        "target": url or "in-process",
+        "concurrency": concurrency,
+        "threads": threads or "default",
+        "payloads": str(payloads) if payloads else "default",
+        "seed": seed,
+        "env": {k: os.environ[k] for k in CONFIG_ENV if k in os.environ},
+        "labels": labels or {},
+    }
+    return report
@@ -0,0 +1,154 @@
+"""
+Logging: nicht-blockierende Ausgabe über QueueHandler/QueueListener,
+eine strukturierte Zusammenfassung pro Request und stichprobenartige
+Detail-Logs der Render-Phasen.
+
+- LOG_FORMAT=text|json          → Ausgabeformat (Default: text)
+- LOG_VERBOSE_SAMPLE_RATE=N     → Phasen-Logs jedes N-ten Requests auf INFO
+                                  (0 = nur bei LOG_LEVEL=DEBUG sichtbar)
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextlib import contextmanager
+
+LOG_VERBOSE_SAMPLE_RATE = int(os.environ.get("LOG_VERBOSE_SAMPLE_RATE", "0"))
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_verbose: contextvars.ContextVar[bool] = contextvars.ContextVar("verbose", default=False)
+_counter = itertools.count(1)
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Record; Zusammenfassungen werden flach eingebettet."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        summary = getattr(record, "summary", None)
+        if summary is not None:
+            entry.update(summary)
+        else:
+            entry["msg"] = record.getMessage()
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _stream_handler() -> logging.Handler:
+    stream = logging.StreamHandler(sys.stderr)
+    if os.environ.get("LOG_FORMAT", "text").lower() == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return stream
+
+
+def configure_logging(default_level: str = "INFO") -> None:
+    """Leitet alle Records über eine Queue an einen Hintergrund-Thread.
+
+    Anfragende Threads schreiben damit nie selbst auf stderr und konkurrieren
+    nicht um den Stream-Lock.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = _stream_handler()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(os.environ.get("LOG_LEVEL", default_level).upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Stoppt den Listener und schreibt ausstehende Records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_worker_logging() -> None:
+    """Für Worker-Prozesse: der Listener-Thread des Elternprozesses existiert
+    nach einem fork nicht, daher direkt auf stderr schreiben."""
+    global _listener
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        root.handlers[:] = [_stream_handler()]
+    _listener = None
+
+
+# ─── Detail-Logs per Stichprobe ───────────────────────────────────────────────
+
+@contextmanager
+def sample_verbose():
+    """Markiert jeden N-ten Request als ausführlich (LOG_VERBOSE_SAMPLE_RATE).
+
+    Der Kontext wird von asyncio.to_thread an den Render-Thread vererbt.
+    """
+    sampled = LOG_VERBOSE_SAMPLE_RATE > 0 and next(_counter) % LOG_VERBOSE_SAMPLE_RATE == 0
+    token = _verbose.set(sampled)
+    try:
+        yield sampled
+    finally:
+        _verbose.reset(token)
+
+
+def detail(logger: logging.Logger, msg: str, *args) -> None:
+    """Phasen-Log: INFO bei ausgewählten Requests, sonst DEBUG."""
+    logger.log(logging.INFO if _verbose.get() else logging.DEBUG, msg, *args)
+
+
+def summary(logger: logging.Logger, fields: dict, level: int = logging.INFO) -> None:
+    """Eine strukturierte Zeile pro Request."""
+    logger.log(
+        level, "%s", json.dumps(fields, ensure_ascii=False, separators=(",", ":")),
+        extra={"summary": fields},
+    )
+
+
+def render_summary(
+    logger: logging.Logger,
+    endpoint: str,
+    status: int,
+    total_ms: float,
+    data: dict,
+    stats: dict,
+    verbose: bool,
+    **extra,
+) -> None:
+    """Zusammenfassung eines Render-Aufrufs (HTTP-Request oder Job)."""
+    timings = stats.get("timings", {})
+    summary(logger, {
+        "event": "render",
+        "endpoint": endpoint,
+        "status": status,
+        "ms": round(total_ms, 1),
+        # Zeit außerhalb der Render-Phasen, v. a. Warten auf einen freien Thread
+        "queue_ms": round(total_ms - sum(timings.values()), 1),
+        "breite": data.get("breite"),
+        "format": data.get("format", "png"),
+        "font": stats.get("font"),
+        "font_source": stats.get("font_source"),
+        "bytes": stats.get("bytes"),
+        "timings": {name: round(ms, 1) for name, ms in timings.items()},
+        "verbose": verbose,
+        **extra,
+    })
@@ -1,25 +1,54 @@
 import asyncio
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import Depends, FastAPI
-from fastapi.responses import Response
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
+from pydantic import ValidationError
 
-from .auth import verify_api_key
-from .generator import generate_image
+from . import jobs, logs, profiling, urls
+from .auth import verify_admin_key, verify_api_key
+from .generator import MEDIA_TYPES, generate_image, warm_up
 from .models import ImageRequest
 
-logging.basicConfig(
-    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Direkter Start per `uvicorn title_image_service.main:app` (z. B. mit
+    # --workers): ohne Root-Handler gingen die INFO-Zusammenfassungen verloren
+    if not logging.getLogger().handlers:
+        logs.configure_logging("INFO")
+
+    # Pillow im Hintergrund vorladen – /health ist sofort erreichbar
+    warmup_task = None
+    if os.environ.get("WARMUP", "true").lower() == "true":
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    workers = None
+    if jobs.JOBS_WORKERS > 0:
+        queue = jobs.get_queue()
+        queue.recover()
+        workers = jobs.JobWorkers(queue, jobs.JOBS_WORKERS)
+        workers.start()
+
+    yield
+
+    if workers is not None:
+        await asyncio.to_thread(workers.stop)
+    if warmup_task is not None:
+        await warmup_task
+
+
 app = FastAPI(
     title="Title Image Service",
     description="Erzeugt 16:9-Titelbilder aus JSON-Parametern.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
@@ -33,39 +62,167 @@ async def health():
     return {"status": "ok"}
 
 
+async def _render(data: dict, endpoint: str) -> tuple[bytes, str, dict]:
+    """Rendert im Thread-Pool; gibt Bilddaten, Server-Timing-Header und die
+    Render-Statistik von generate_image() zurück.
+
+    Schreibt pro Aufruf genau eine strukturierte Zusammenfassung ins Log.
+    """
+    stats: dict = {}
+    status = 200
+    start = time.perf_counter()
+    try:
+        with logs.sample_verbose() as verbose:
+            image_bytes: bytes = await asyncio.to_thread(
+                profiling.run_profiled, generate_image, data, None, stats
+            )
+    except Exception as e:
+        logger.exception("Fehler bei der Bildgenerierung: %s", e)
+        # Pillow wirft ValueError bei ungültigen Farben
+        status = 422 if isinstance(e, (ValueError, OSError)) else 500
+        detail = str(e) if status == 422 else "Interner Serverfehler"
+        # Auch fehlgeschlagene (oft gerade die langsamen) Aufrufe erhalten Server-Timing
+        raise HTTPException(
+            status_code=status,
+            detail=detail,
+            headers={"Server-Timing": _server_timing(stats, start)},
+        )
+    finally:
+        total_ms = (time.perf_counter() - start) * 1000
+        logs.render_summary(logger, endpoint, status, total_ms, data, stats, verbose)
+
+    return image_bytes, profiling.server_timing_header(stats.get("timings", {}), total_ms), stats
+
+
+def _server_timing(stats: dict, start: float) -> str:
+    total_ms = (time.perf_counter() - start) * 1000
+    return profiling.server_timing_header(stats.get("timings", {}), total_ms)
+
+
 @app.post("/generate")
 async def generate(
     request: ImageRequest,
+    redirect: bool = False,
     _: str = Depends(verify_api_key),
 ):
+    if redirect:
+        return RedirectResponse(urls.image_url(request), status_code=303)
+
     data = request.model_dump()
     filename = data.pop("dateiname", "").strip()
     if not filename:
-        filename = datetime.now().strftime("linkedin_title_%Y-%m-%d-%H-%M.png")
+        filename = datetime.now().strftime(f"linkedin_title_%Y-%m-%d-%H-%M.{request.format}")
+
+    image_bytes, server_timing, _ = await _render(data, "/generate")
+    return Response(
+        content=image_bytes,
+        media_type=MEDIA_TYPES[request.format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Server-Timing": server_timing,
+        },
+    )
+
+
+@app.get("/images/{image_hash}.{ext}")
+async def get_image(
+    image_hash: str,
+    ext: str,
+    request: Request,
+    t: str | None = None,
+    if_none_match: str | None = Header(None),
+    x_api_key: str | None = Header(None, alias="X-API-Key"),
+):
+    """Kanonische, unveränderliche Bild-URL.
+
+    Parameter kommen aus dem signierten Token `t` (von Proxies und CDNs
+    cachebar) oder – mit API-Key – aus dem Query-String (nur privat cachebar).
+    Der Hash muss zu den Parametern passen.
+    """
+    if t is not None:
+        params = urls.read_token(t)
+        if params is None:
+            raise HTTPException(status_code=403, detail="Ungültiger Token")
+        cache_control = urls.CACHE_CONTROL
+    else:
+        await verify_api_key(x_api_key)
+        params = dict(request.query_params)
+        cache_control = urls.CACHE_CONTROL_PRIVATE
 
     try:
-        png_bytes: bytes = await asyncio.to_thread(generate_image, data, None)
-    except Exception as e:
-        logger.exception("Fehler bei der Bildgenerierung: %s", e)
-        # Pillow wirft ValueError bei ungültigen Farben
-        if isinstance(e, (ValueError, OSError)):
-            from fastapi import HTTPException
-            raise HTTPException(status_code=422, detail=str(e))
-        from fastapi import HTTPException
-        raise HTTPException(status_code=500, detail="Interner Serverfehler")
+        image_request = ImageRequest.model_validate(params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    if ext != image_request.format or image_request.content_hash() != image_hash:
+        raise HTTPException(status_code=404, detail="Bild nicht gefunden")
+
+    etag = f'"{image_hash}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
 
+    image_bytes, server_timing, stats = await _render(
+        image_request.model_dump(exclude={"dateiname"}), "/images"
+    )
+    if stats.get("font_source") in urls.UNSTABLE_FONT_SOURCES:
+        # Ersatzfont (Download fehlgeschlagen, Cache verdrängt): nicht unter der
+        # kanonischen URL festschreiben, der nächste Abruf rendert neu
+        headers = {"Cache-Control": "no-store"}
     return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        content=image_bytes,
+        media_type=MEDIA_TYPES[image_request.format],
+        headers={**headers, "Server-Timing": server_timing},
     )
 
 
-def run():
-    import uvicorn
-    uvicorn.run(
-        "title_image_service.main:app",
-        host=os.getenv("HOST", "127.0.0.1"),
-        port=int(os.getenv("PORT", 8000)),
-        reload=False,
-    )
+@app.post("/jobs", status_code=202)
+async def create_job(
+    request: ImageRequest,
+    response: Response,
+    _: str = Depends(verify_api_key),
+):
+    """Legt einen Render-Job an und antwortet sofort mit dessen ID."""
+    job_id = await asyncio.to_thread(jobs.get_queue().submit, request.model_dump())
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return {"id": job_id, "status": "queued", "url": f"/jobs/{job_id}"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, _: str = Depends(verify_api_key)):
+    """Status eines Jobs – oder das fertige Bild."""
+    queue = jobs.get_queue()
+    job = await asyncio.to_thread(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden oder abgelaufen")
+
+    if job["status"] == "done":
+        try:
+            image_bytes = await asyncio.to_thread(queue.result_path(job_id).read_bytes)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden oder abgelaufen")
+        fmt = job["params"].get("format", "png")
+        filename = job["params"].get("dateiname") or f"{job_id}.{fmt}"
+        return Response(
+            content=image_bytes,
+            media_type=MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    body = {"id": job_id, "status": job["status"]}
+    if job["status"] == "failed":
+        body["error"] = job["error"]
+        return body
+    return JSONResponse(body, status_code=202)
+
+
+@app.get("/admin/profiles")
+async def list_profiles(_: str = Depends(verify_admin_key)):
+    return {"profiles": profiling.list_profiles()}
+
+
+@app.get("/admin/profiles/{name}")
+async def get_profile(name: str, _: str = Depends(verify_admin_key)):
+    path = profiling.profile_file(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil nicht gefunden")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
@@ -1,4 +1,7 @@
+import hashlib
+import json
 import re
+from typing import Literal
 
 from pydantic import BaseModel, field_validator
 
@@ -11,7 +14,8 @@ class ImageRequest(BaseModel):
     breite:      int = 1024
     font:        str = "Rubik Glitch"
     titelzeilen: int = 1
-    dateiname:   str = ""  # Leer → linkedin_title_<YYYY-MM-DD-HH-mm>.png
+    format:      Literal["png", "svg"] = "png"
+    dateiname:   str = ""  # Leer → linkedin_title_<YYYY-MM-DD-HH-mm>.<format>
 
     @field_validator("dateiname")
     @classmethod
@@ -23,3 +27,17 @@ class ImageRequest(BaseModel):
                 "Bindestriche und Unterstriche enthalten (max. 128 Zeichen)."
             )
         return v
+
+    def content_hash(self) -> str:
+        """Stabiler Hash über alle bildrelevanten Parameter.
+
+        `dateiname` fließt nicht ein; Farben werden normalisiert, damit
+        z. B. "weiß" und "white" denselben Hash ergeben.
+        """
+        from .generator import normalize_color
+
+        params = self.model_dump(exclude={"dateiname"})
+        params["vordergrund"] = normalize_color(params["vordergrund"]).lower()
+        params["hintergrund"] = normalize_color(params["hintergrund"]).lower()
+        canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
@@ -0,0 +1,188 @@
+"""
+Server-Timing-Header und stichprobenartiges Profiling von Render-Aufrufen.
+
+- PROFILE_SAMPLE_RATE=N  → jeder N-te Aufruf läuft unter cProfile (0 = aus)
+- PROFILE_SLOW_MS=T      → übrige Aufrufe werden per Stack-Sampling beobachtet
+                           und nur gespeichert, wenn sie länger als T ms dauern
+                           (0 = aus)
+
+Profile landen in PROFILE_DIR, ältere Dateien werden über PROFILE_MAX_FILES
+hinaus gelöscht (Ringpuffer).
+"""
+
+import cProfile
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = int(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS     = float(os.environ.get("PROFILE_SLOW_MS", "0"))
+PROFILE_MAX_FILES   = int(os.environ.get("PROFILE_MAX_FILES", "50"))
+PROFILE_DIR = Path(
+    os.environ.get("PROFILE_DIR", Path.home() / ".cache" / "title-image-profiles")
+)
+
+# Abtastintervall des Stack-Samplers
+_SAMPLE_INTERVAL = 0.005
+
+PROFILE_NAME_RE = re.compile(r"[0-9T]+-(cprofile|stacks)-\d+ms\.(prof|folded)")
+
+_counter = itertools.count(1)
+_ring_lock = threading.Lock()
+# Ab Python 3.12 darf pro Prozess nur ein cProfile aktiv sein
+_cprofile_lock = threading.Lock()
+
+
+def server_timing_header(timings: dict[str, float], total_ms: float | None = None) -> str:
+    """Formatiert Phasendauern (ms) als Server-Timing-Header."""
+    parts = [f"{name};dur={ms:.1f}" for name, ms in timings.items()]
+    if total_ms is not None:
+        parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+# ─── Stack-Sampling ───────────────────────────────────────────────────────────
+
+class _StackSampler:
+    """Tastet periodisch den Stack eines Threads ab (gefaltetes Format)."""
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self):
+        try:
+            self._thread.start()
+        except RuntimeError as e:
+            logger.warning("Stack-Sampler nicht gestartet: %s", e)
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def dump(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# ─── Ringpuffer ───────────────────────────────────────────────────────────────
+
+def _profile_path(kind: str, elapsed_ms: float) -> Path:
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    ext = "prof" if kind == "cprofile" else "folded"
+    return PROFILE_DIR / f"{stamp}-{kind}-{int(elapsed_ms)}ms.{ext}"
+
+
+def _trim_ring() -> None:
+    files = list_profiles()
+    for old in files[PROFILE_MAX_FILES:]:
+        try:
+            (PROFILE_DIR / old["name"]).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles() -> list[dict]:
+    """Gespeicherte Profile, neueste zuerst."""
+    if not PROFILE_DIR.is_dir():
+        return []
+    entries = []
+    for p in PROFILE_DIR.iterdir():
+        if PROFILE_NAME_RE.fullmatch(p.name):
+            entries.append({"name": p.name, "bytes": p.stat().st_size})
+    return sorted(entries, key=lambda e: e["name"], reverse=True)
+
+
+def profile_file(name: str) -> Path | None:
+    """Pfad zu einem gespeicherten Profil oder None (auch bei ungültigem Namen)."""
+    if not PROFILE_NAME_RE.fullmatch(name):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
+
+
+# ─── Aufruf-Wrapper ───────────────────────────────────────────────────────────
+
+def _start_cprofile() -> cProfile.Profile | None:
+    """Startet cProfile, sofern kein anderer Aufruf gerade profiliert wird."""
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    except Exception as e:
+        _cprofile_lock.release()
+        logger.warning("cProfile nicht verfügbar, nutze Stack-Sampling: %s", e)
+        return None
+
+
+def run_profiled(func: Callable, *args, **kwargs):
+    """Führt `func` aus und speichert bei Bedarf ein Profil.
+
+    Muss im ausführenden Thread laufen (z. B. innerhalb von asyncio.to_thread),
+    da cProfile und der Stack-Sampler threadgebunden arbeiten. Läuft bereits
+    ein cProfile, wird der Aufruf stattdessen per Stack-Sampling aufgezeichnet;
+    Profiling verändert nie das Ergebnis von `func`.
+    """
+    sampled = PROFILE_SAMPLE_RATE > 0 and next(_counter) % PROFILE_SAMPLE_RATE == 0
+    if not sampled and PROFILE_SLOW_MS <= 0:
+        return func(*args, **kwargs)
+
+    start = time.perf_counter()
+    profiler = _start_cprofile() if sampled else None
+    if profiler is not None:
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _cprofile_lock.release()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _store(profiler.dump_stats, "cprofile", elapsed_ms)
+
+    sampler = _StackSampler(threading.get_ident())
+    try:
+        with sampler:
+            return func(*args, **kwargs)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if sampled or elapsed_ms >= PROFILE_SLOW_MS:
+            _store(sampler.dump, "stacks", elapsed_ms)
+
+
+def _store(write: Callable[[Path], None], kind: str, elapsed_ms: float) -> None:
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _profile_path(kind, elapsed_ms)
+        write(path)
+        with _ring_lock:
+            _trim_ring()
+        logger.info("Profil gespeichert: %s (%.0f ms)", path.name, elapsed_ms)
+    except OSError as e:
+        logger.warning("Profil konnte nicht gespeichert werden: %s", e)
@@ -0,0 +1,79 @@
+"""
+Kanonische, cachebare Bild-URLs: GET /images/{hash}.{ext}
+
+Die Parameter stehen entweder im Query-String (erfordert X-API-Key) oder in
+einem kompakten, per HMAC signierten Token `t` (ohne API-Key abrufbar, z. B.
+über ein CDN). Der Token ist nur verfügbar, wenn IMAGE_URL_SECRET gesetzt ist.
+
+Nur Token-URLs dürfen in geteilten Caches liegen; Antworten auf die
+Query-String-Form sind `private`, sonst läge ein per Key geschütztes Bild
+für jeden mit der URL im CDN.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+from urllib.parse import urlencode
+
+from .models import ImageRequest
+
+IMAGE_URL_SECRET = os.environ.get("IMAGE_URL_SECRET", "")
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CACHE_CONTROL_PRIVATE = "private, max-age=31536000, immutable"
+
+# Font-Quellen, bei denen nicht der angeforderte Font gerendert wurde
+UNSTABLE_FONT_SOURCES = ("fallback", "default")
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> str:
+    digest = hmac.new(IMAGE_URL_SECRET.encode("utf-8"), payload.encode("ascii"), hashlib.sha256).digest()
+    return _b64(digest[:16])
+
+
+def _params(request: ImageRequest) -> dict:
+    """Bildparameter ohne Defaults – hält Token und Query-String kurz."""
+    return request.model_dump(exclude={"dateiname"}, exclude_defaults=True)
+
+
+def make_token(request: ImageRequest) -> str:
+    payload = _b64(json.dumps(_params(request), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_signature(payload)}"
+
+
+def read_token(token: str) -> dict | None:
+    """Parameter aus einem Token; None bei fehlendem Secret oder falscher Signatur."""
+    if not IMAGE_URL_SECRET:
+        return None
+    if not token.isascii():
+        return None
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature, _signature(payload)):
+        return None
+    try:
+        params = json.loads(_unb64(payload))
+    except ValueError:
+        return None
+    return params if isinstance(params, dict) else None
+
+
+def image_url(request: ImageRequest) -> str:
+    """Kanonische URL; mit Token, wenn IMAGE_URL_SECRET gesetzt ist.
+
+    Die Dateiendung entspricht dem Ausgabeformat.
+    """
+    path = f"/images/{request.content_hash()}.{request.format}"
+    if IMAGE_URL_SECRET:
+        return f"{path}?t={make_token(request)}"
+    params = _params(request)
+    return f"{path}?{urlencode(params)}" if params else path
@@ -0,0 +1,145 @@
+"""
+Vektor-Backend: erzeugt SVG aus dem fertigen Layout von generate_image().
+
+Die Kosten hängen nur von der Textmenge ab, nicht von der Bildbreite – es wird
+weder gerastert noch komprimiert. Ist fontTools installiert (Extra `vector`),
+werden die verwendeten Glyphen als Pfade eingebettet; die Darstellung ist dann
+unabhängig von installierten Schriften. Ohne fontTools wird die Fontdatei per
+@font-face eingebettet.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import importlib.util
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+from xml.sax.saxutils import escape, quoteattr
+
+if TYPE_CHECKING:
+    from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+# (Zeile, Font, x, y) – y ist wie bei ImageDraw.text die Oberkante (Anker "la")
+PlacedLine = tuple[str, "ImageFont.FreeTypeFont | ImageFont.ImageFont", int, int]
+
+_FONT_MIME = {".ttf": "font/ttf", ".otf": "font/otf", ".ttc": "font/collection"}
+
+
+def has_outlines() -> bool:
+    return importlib.util.find_spec("fontTools") is not None
+
+
+@functools.lru_cache(maxsize=8)
+def _load_ttfont(font_path: str):
+    """Geteilter TTFont samt Sperre.
+
+    fontTools lädt Tabellen und Glyphen beim ersten Zugriff nach; das ist
+    nicht threadsicher. Alle Zugriffe laufen daher unter der Sperre.
+    """
+    from fontTools.ttLib import TTFont
+
+    kwargs = {"fontNumber": 0} if font_path.lower().endswith(".ttc") else {}
+    return TTFont(font_path, lazy=True, **kwargs), threading.Lock()
+
+
+def _hex(rgb: tuple[int, ...]) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*rgb[:3])
+
+
+def _ascent(font) -> int:
+    return font.getmetrics()[0] if hasattr(font, "getmetrics") else 0
+
+
+def _font_size(font) -> float:
+    return float(getattr(font, "size", 10))
+
+
+def _outline_body(font_path: str, lines: list[PlacedLine], fill: str) -> list[str]:
+    tt, lock = _load_ttfont(font_path)
+    with lock:
+        return _outline_body_locked(tt, lines, fill)
+
+
+def _outline_body_locked(tt, lines: list[PlacedLine], fill: str) -> list[str]:
+    from fontTools.pens.svgPathPen import SVGPathPen
+
+    cmap = tt.getBestCmap() or {}
+    glyph_set = tt.getGlyphSet()
+    hmtx = tt["hmtx"]
+    upem = tt["head"].unitsPerEm
+
+    ids: dict[str, str] = {}
+    defs: list[str] = []
+    uses: list[str] = []
+    for text, font, x, y in lines:
+        scale = _font_size(font) / upem
+        baseline = y + _ascent(font)
+        pen_x = float(x)
+        for ch in text:
+            name = cmap.get(ord(ch), ".notdef")
+            if name not in ids:
+                pen = SVGPathPen(glyph_set)
+                glyph_set[name].draw(pen)
+                commands = pen.getCommands()
+                ids[name] = f"g{len(ids)}" if commands else ""
+                if commands:
+                    defs.append(f'<path id="{ids[name]}" d="{commands}"/>')
+            if ids[name]:
+                uses.append(
+                    f'<use xlink:href="#{ids[name]}" '
+                    f'transform="translate({pen_x:.2f} {baseline}) scale({scale:.5f} {-scale:.5f})"/>'
+                )
+            pen_x += hmtx[name][0] * scale
+    return [f"<defs>{''.join(defs)}</defs>", f'<g fill="{fill}">', *uses, "</g>"]
+
+
+def _text_body(font_path: str | None, lines: list[PlacedLine], fill: str) -> list[str]:
+    body = []
+    family = "sans-serif"
+    if font_path:
+        mime = _FONT_MIME.get(Path(font_path).suffix.lower(), "font/ttf")
+        data = base64.b64encode(Path(font_path).read_bytes()).decode("ascii")
+        body.append(f'<style>@font-face{{font-family:"f0";src:url(data:{mime};base64,{data})}}</style>')
+        family = '"f0"'
+    body.append(f'<g fill="{fill}" font-family={quoteattr(family)}>')
+    for text, font, x, y in lines:
+        body.append(
+            f'<text x="{x}" y="{y + _ascent(font)}" font-size="{_font_size(font):g}" '
+            f'xml:space="preserve">{escape(text)}</text>'
+        )
+    body.append("</g>")
+    return body
+
+
+def render_svg(
+    width: int,
+    height: int,
+    fg: tuple[int, ...],
+    bg: tuple[int, ...],
+    font_path: str | None,
+    lines: list[PlacedLine],
+) -> str:
+    """SVG-Dokument für die platzierten Zeilen."""
+    fill = _hex(fg)
+    body = None
+    if font_path and has_outlines():
+        try:
+            body = _outline_body(font_path, lines, fill)
+        except Exception as e:
+            logger.warning("Glyph-Outlines nicht verfügbar (%s), bette Font ein.", e)
+    if body is None:
+        body = _text_body(font_path, lines, fill)
+    return "\n".join([
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<rect width="100%" height="100%" fill="{_hex(bg)}"/>',
+        *body,
+        "</svg>",
+        "",
+    ])
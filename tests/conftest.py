@@ -1,4 +1,5 @@
 import json
+import logging
 
 import pytest
 from fastapi.testclient import TestClient
@@ -18,3 +19,15 @@ def client(keys_file, monkeypatch):
     monkeypatch.setattr(auth_mod, "_KEYS_FILE", keys_file)
     from title_image_service.main import app
     return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    # CLI-Tests konfigurieren das Root-Logging; danach Originalzustand herstellen
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    from title_image_service.logs import shutdown_logging
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
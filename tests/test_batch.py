@@ -0,0 +1,131 @@
+import json
+import os
+
+import pytest
+
+import title_image_service.batch as batch_mod
+from title_image_service.batch import render_manifest
+from title_image_service.cli import run
+from title_image_service.models import ImageRequest
+
+
+def write_manifest(path, entries):
+    path.write_text("\n".join(
+        e if isinstance(e, str) else json.dumps(e) for e in entries
+    ) + "\n", encoding="utf-8")
+    return path
+
+
+# ── Inhalts-Hash ──────────────────────────────────────────────────────────────
+
+def test_content_hash_ignores_dateiname():
+    a = ImageRequest(titel="A", dateiname="a.png")
+    b = ImageRequest(titel="A")
+    assert a.content_hash() == b.content_hash()
+
+
+def test_content_hash_normalizes_colors():
+    a = ImageRequest(titel="A", vordergrund="weiß")
+    b = ImageRequest(titel="A", vordergrund="White")
+    assert a.content_hash() == b.content_hash()
+
+
+def test_content_hash_differs_by_params():
+    assert ImageRequest(titel="A").content_hash() != ImageRequest(titel="B").content_hash()
+
+
+# ── render_manifest ──────────────────────────────────────────────────────────
+
+def test_render_manifest_names_outputs(tmp_path):
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        {"titel": "Eins", "breite": 160, "dateiname": "eins.png"},
+        {"titel": "Zwei", "breite": 160},
+    ])
+    out = tmp_path / "out"
+    result = render_manifest(manifest, out, workers=1)
+    assert (result.rendered, result.skipped, result.failed) == (2, 0, 0)
+    expected_hash = ImageRequest(titel="Zwei", breite=160).content_hash()
+    assert sorted(p.name for p in out.iterdir()) == sorted(["eins.png", f"{expected_hash}.png"])
+
+
+def test_render_manifest_skips_up_to_date(tmp_path):
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        {"titel": "Eins", "breite": 160, "dateiname": "eins.png"},
+        {"titel": "Zwei", "breite": 160},
+    ])
+    out = tmp_path / "out"
+    render_manifest(manifest, out, workers=1)
+    result = render_manifest(manifest, out, workers=1)
+    assert (result.rendered, result.skipped) == (0, 2)
+
+
+def test_render_manifest_rerenders_stale_named_output(tmp_path):
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        {"titel": "Eins", "breite": 160, "dateiname": "eins.png"},
+    ])
+    out = tmp_path / "out"
+    render_manifest(manifest, out, workers=1)
+    stale = manifest.stat().st_mtime - 60
+    os.utime(out / "eins.png", (stale, stale))
+    result = render_manifest(manifest, out, workers=1)
+    assert result.rendered == 1
+
+
+def test_render_manifest_counts_invalid_lines(tmp_path):
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        "{kein json",
+        {"titel": "X", "dateiname": "../boese.png"},
+        {"titel": "X", "breite": 160, "hintergrund": "notacolor!!!"},
+        {"titel": "Ok", "breite": 160},
+    ])
+    result = render_manifest(manifest, tmp_path / "out", workers=1)
+    assert (result.rendered, result.failed) == (1, 3)
+
+
+def test_render_manifest_rejects_conflicting_dateiname(tmp_path, caplog):
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        {"titel": "A", "breite": 160, "dateiname": "gleich.png"},
+        {"titel": "A", "breite": 160, "dateiname": "gleich.png"},
+        {"titel": "B", "breite": 160, "dateiname": "gleich.png"},
+    ])
+    result = render_manifest(manifest, tmp_path / "out", workers=1)
+    assert (result.rendered, result.skipped, result.failed) == (1, 1, 1)
+    assert "bereits durch Zeile 1" in caplog.text
+
+
+def _crash_on_boom(data, output_path=None, stats=None):
+    if data["titel"] == "Boom":
+        os._exit(1)
+    return _real_generate_image(data, output_path, stats)
+
+
+_real_generate_image = batch_mod.generate_image
+
+
+def test_render_manifest_survives_dead_worker(tmp_path, monkeypatch):
+    # Wirkt in den per fork gestarteten Workern
+    monkeypatch.setattr(batch_mod, "generate_image", _crash_on_boom)
+    manifest = write_manifest(tmp_path / "m.jsonl", [
+        {"titel": "Boom", "breite": 160},
+        {"titel": "Eins", "breite": 160},
+        {"titel": "Zwei", "breite": 160},
+        {"titel": "Drei", "breite": 160},
+    ])
+    result = render_manifest(manifest, tmp_path / "out", workers=1)
+    assert result.rendered + result.failed == 4
+    assert result.failed >= 1
+    assert result.rendered >= 1
+
+
+def test_cli_render_missing_manifest(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        run(["render", str(tmp_path / "fehlt.jsonl")])
+    assert exc.value.code == 2
+    assert "Manifest nicht gefunden" in capsys.readouterr().err
+
+
+def test_cli_render_exit_code(tmp_path, capsys):
+    manifest = write_manifest(tmp_path / "m.jsonl", [{"titel": "CLI", "breite": 160}])
+    rc = run(["render", str(manifest), "-o", str(tmp_path / "out"), "-j", "1"])
+    assert rc == 0
+    assert "Gerendert: 1" in capsys.readouterr().out
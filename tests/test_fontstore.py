@@ -0,0 +1,145 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import title_image_service.generator as generator_mod
+from title_image_service.fontstore import MANIFEST_NAME, FontStore
+
+
+def fake_font(size: int, fill: bytes = b"x") -> bytes:
+    return fill * size
+
+
+def test_add_and_lookup(tmp_path):
+    store = FontStore(tmp_path)
+    path = store.add("Fira Code", fake_font(10), ".ttf")
+    assert path == str(tmp_path / "fira_code.ttf")
+    assert store.lookup("Fira Code") == path
+    assert store.lookup("fira code") == path
+    assert store.lookup("Unbekannt") is None
+
+
+def test_manifest_is_shared_between_instances(tmp_path):
+    FontStore(tmp_path).add("Rubik Glitch", fake_font(10), ".ttf", pinned=True)
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert manifest["fonts"]["rubik_glitch"]["pinned"] is True
+    assert FontStore(tmp_path).lookup("Rubik Glitch") == str(tmp_path / "rubik_glitch.ttf")
+
+
+def test_corrupt_font_is_discarded(tmp_path):
+    FontStore(tmp_path).add("Fira Code", fake_font(10), ".ttf")
+    (tmp_path / "fira_code.ttf").write_bytes(b"kaputt")
+    store = FontStore(tmp_path)
+    assert store.lookup("Fira Code") is None
+    assert not (tmp_path / "fira_code.ttf").exists()
+    assert "fira_code" not in json.loads((tmp_path / MANIFEST_NAME).read_text())["fonts"]
+
+
+def test_missing_font_file_is_discarded(tmp_path):
+    FontStore(tmp_path).add("Fira Code", fake_font(10), ".ttf")
+    (tmp_path / "fira_code.ttf").unlink()
+    assert FontStore(tmp_path).lookup("Fira Code") is None
+
+
+def test_lru_eviction_spares_pinned_fonts(tmp_path):
+    store = FontStore(tmp_path, max_bytes=25)
+    store.add("Pinned", fake_font(100), ".ttf", pinned=True)
+    store.add("Alt", fake_font(10), ".ttf")
+    time.sleep(0.01)
+    store.add("Mittel", fake_font(10), ".ttf")
+    time.sleep(0.01)
+    store.lookup("Alt")  # Alt wird zuletzt benutzt
+    time.sleep(0.01)
+    store.add("Neu", fake_font(10), ".ttf")
+
+    assert store.lookup("Pinned") is not None
+    assert store.lookup("Alt") is not None
+    assert store.lookup("Neu") is not None
+    assert store.lookup("Mittel") is None
+    assert not (tmp_path / "mittel.ttf").exists()
+
+
+def test_oversized_download_is_kept(tmp_path):
+    store = FontStore(tmp_path, max_bytes=5)
+    store.add("Gross", fake_font(50), ".ttf")
+    assert store.lookup("Gross") is not None
+
+
+def test_existing_cache_is_adopted(tmp_path):
+    (tmp_path / "jetbrains_mono.ttf").write_bytes(fake_font(10))
+    (tmp_path / "notiz.txt").write_text("kein Font")
+    store = FontStore(tmp_path)
+    assert store.lookup("JetBrains Mono") == str(tmp_path / "jetbrains_mono.ttf")
+    fonts = json.loads((tmp_path / MANIFEST_NAME).read_text())["fonts"]
+    assert set(fonts) == {"jetbrains_mono"}
+    assert fonts["jetbrains_mono"]["pinned"] is False
+
+
+@pytest.mark.parametrize("manifest", [
+    "[]",
+    '{"fonts": []}',
+    '{"fonts": {"fira_code": {"file": "fira_code.ttf"}}}',
+    '{"fonts": {"fira_code": {"file": "../x.ttf", "sha256": "0", "bytes": 1, "pinned": false, "last_used": 0}}}',
+])
+def test_malformed_manifest_is_rebuilt(tmp_path, manifest):
+    (tmp_path / "fira_code.ttf").write_bytes(fake_font(10))
+    (tmp_path / MANIFEST_NAME).write_text(manifest)
+    assert FontStore(tmp_path).lookup("Fira Code") == str(tmp_path / "fira_code.ttf")
+    fonts = json.loads((tmp_path / MANIFEST_NAME).read_text())["fonts"]
+    assert set(fonts) == {"fira_code"}
+
+
+def test_orphaned_font_is_adopted_on_lookup(tmp_path):
+    store = FontStore(tmp_path)
+    store.add("Fira Code", fake_font(10), ".ttf")
+    (tmp_path / "verwaist.ttf").write_bytes(fake_font(10))
+    assert store.lookup("Verwaist") == str(tmp_path / "verwaist.ttf")
+    assert "verwaist" in json.loads((tmp_path / MANIFEST_NAME).read_text())["fonts"]
+
+
+def test_lookup_survives_unwritable_manifest(tmp_path, monkeypatch):
+    (tmp_path / "fira_code.ttf").write_bytes(fake_font(10))
+    (tmp_path / "kaputt.ttf").write_bytes(fake_font(10))
+    FontStore(tmp_path).lookup("Kaputt")
+    (tmp_path / "kaputt.ttf").write_bytes(b"anders")
+
+    def read_only(self):
+        raise PermissionError(30, "Read-only file system")
+
+    monkeypatch.setattr(FontStore, "_save", read_only)
+    monkeypatch.setattr("title_image_service.fontstore._TOUCH_INTERVAL", 0)
+    store = FontStore(tmp_path)
+    assert store.lookup("Fira Code") == str(tmp_path / "fira_code.ttf")
+    assert store.lookup("Kaputt") is None
+
+
+def test_adoption_without_writable_directory(tmp_path, monkeypatch):
+    (tmp_path / "fira_code.ttf").write_bytes(fake_font(10))
+
+    def read_only(self):
+        raise PermissionError(30, "Read-only file system")
+
+    monkeypatch.setattr(FontStore, "_save", read_only)
+    assert FontStore(tmp_path).lookup("Fira Code") == str(tmp_path / "fira_code.ttf")
+
+
+def _add_fonts(directory, prefix):
+    store = FontStore(directory)
+    for i in range(10):
+        store.add(f"{prefix} {i}", fake_font(10), ".ttf")
+
+
+def test_concurrent_processes_keep_all_entries(tmp_path):
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_add_fonts, [tmp_path] * 4, ["a", "b", "c", "d"]))
+    fonts = json.loads((tmp_path / MANIFEST_NAME).read_text())["fonts"]
+    assert len(fonts) == 40
+
+
+def test_try_cache_uses_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator_mod, "FONT_CACHE_DIR", tmp_path)
+    FontStore(tmp_path).add("Fira Code", fake_font(10), ".ttf")
+    assert generator_mod.try_cache("Fira Code") == str(tmp_path / "fira_code.ttf")
+    assert generator_mod.try_cache("Fira") is None
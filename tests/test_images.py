@@ -0,0 +1,140 @@
+from urllib.parse import urlsplit
+
+import pytest
+
+import title_image_service.generator as generator_mod
+import title_image_service.urls as urls_mod
+from title_image_service.models import ImageRequest
+
+
+@pytest.fixture()
+def secret(monkeypatch):
+    monkeypatch.setattr(urls_mod, "IMAGE_URL_SECRET", "test-secret")
+
+
+@pytest.fixture(autouse=True)
+def font_found(monkeypatch):
+    """Der angeforderte Font gilt als gefunden – sonst wäre jede Antwort no-store."""
+    path, name, _ = generator_mod.resolve_font_source("Rubik Glitch")
+    monkeypatch.setattr(generator_mod, "resolve_font_source", lambda font: (path, font, "cache"))
+
+
+def get(client, url, **headers):
+    return client.get(url, headers=headers, follow_redirects=False)
+
+
+# ── Token ────────────────────────────────────────────────────────────────────
+
+def test_token_roundtrip(secret):
+    request = ImageRequest(titel="Token", breite=320)
+    assert urls_mod.read_token(urls_mod.make_token(request)) == {"titel": "Token", "breite": 320}
+
+
+def test_token_rejects_tampering(secret):
+    token = urls_mod.make_token(ImageRequest(titel="Token"))
+    other = urls_mod.make_token(ImageRequest(titel="Anders"))
+    forged = other.split(".")[0] + "." + token.split(".")[1]
+    assert urls_mod.read_token(forged) is None
+    assert urls_mod.read_token("kaputt") is None
+
+
+def test_token_disabled_without_secret(monkeypatch):
+    monkeypatch.setattr(urls_mod, "IMAGE_URL_SECRET", "")
+    assert urls_mod.read_token("abc.def") is None
+
+
+# ── POST /generate?redirect=true ─────────────────────────────────────────────
+
+def test_generate_redirect_uses_token(client, secret):
+    resp = client.post(
+        "/generate?redirect=true",
+        json={"titel": "Redirect", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+        follow_redirects=False,
+    )
+    assert resp.status_code == 303
+    location = urlsplit(resp.headers["location"])
+    expected = ImageRequest(titel="Redirect", breite=320).content_hash()
+    assert location.path == f"/images/{expected}.png"
+    assert location.query.startswith("t=")
+
+
+def test_generate_redirect_without_secret_uses_query(client, monkeypatch):
+    monkeypatch.setattr(urls_mod, "IMAGE_URL_SECRET", "")
+    resp = client.post(
+        "/generate?redirect=true",
+        json={"titel": "Redirect", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+        follow_redirects=False,
+    )
+    assert resp.status_code == 303
+    assert urlsplit(resp.headers["location"]).query == "titel=Redirect&breite=320"
+
+
+# ── GET /images/{hash}.{ext} ─────────────────────────────────────────────────
+
+def test_get_image_with_token_needs_no_key(client, secret):
+    url = urls_mod.image_url(ImageRequest(titel="CDN", breite=320))
+    resp = get(client, url)
+    assert resp.status_code == 200
+    assert resp.content[:4] == b"\x89PNG"
+    assert "immutable" in resp.headers["cache-control"]
+    assert resp.headers["etag"] == f'"{urlsplit(url).path[8:-4]}"'
+
+
+def test_get_image_with_invalid_token(client, secret):
+    url = urls_mod.image_url(ImageRequest(titel="CDN", breite=320))
+    assert get(client, url + "x").status_code == 403
+
+
+def test_get_image_query_requires_key(client):
+    request = ImageRequest(titel="Query", breite=320)
+    path = f"/images/{request.content_hash()}.png?titel=Query&breite=320"
+    assert get(client, path).status_code == 401
+    assert get(client, path, **{"X-API-Key": "sk-valid"}).status_code == 200
+
+
+def test_get_image_cache_control_per_mode(client, secret):
+    request = ImageRequest(titel="Cache", breite=320)
+    token_resp = get(client, urls_mod.image_url(request))
+    assert token_resp.headers["cache-control"].startswith("public")
+
+    path = f"/images/{request.content_hash()}.png?titel=Cache&breite=320"
+    query_resp = get(client, path, **{"X-API-Key": "sk-valid"})
+    assert query_resp.status_code == 200
+    assert query_resp.headers["cache-control"].startswith("private")
+    assert "public" not in query_resp.headers["cache-control"]
+
+
+def test_get_image_non_ascii_token_is_403(client, secret):
+    assert urls_mod.read_token("é.é") is None
+    assert get(client, "/images/abc.png?t=%C3%A9.%C3%A9").status_code == 403
+    assert get(client, "/images/abc.png?t=abc.%C3%A9").status_code == 403
+
+
+def test_get_image_hash_mismatch_is_404(client, secret):
+    url = urls_mod.image_url(ImageRequest(titel="CDN", breite=320))
+    _, _, query = url.partition("?")
+    assert get(client, f"/images/{'0' * 24}.png?{query}").status_code == 404
+
+
+def test_get_image_unknown_extension_is_404(client, secret):
+    url = urls_mod.image_url(ImageRequest(titel="CDN", breite=320)).replace(".png?", ".gif?")
+    assert get(client, url).status_code == 404
+
+
+@pytest.mark.parametrize("source", ["fallback", "default"])
+def test_get_image_with_substitute_font_is_not_cached(client, secret, monkeypatch, source):
+    monkeypatch.setattr(generator_mod, "resolve_font_source", lambda font: (None, "Default", source))
+    resp = get(client, urls_mod.image_url(ImageRequest(titel="CDN", breite=320)))
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "no-store"
+    assert "etag" not in resp.headers
+
+
+def test_get_image_if_none_match_returns_304(client, secret):
+    url = urls_mod.image_url(ImageRequest(titel="CDN", breite=320))
+    etag = get(client, url).headers["etag"]
+    resp = get(client, url, **{"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
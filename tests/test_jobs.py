@@ -0,0 +1,239 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import title_image_service.jobs as jobs_mod
+from title_image_service.jobs import JobQueue, JobWorkers
+
+HEADERS = {"X-API-Key": "sk-valid"}
+
+
+@pytest.fixture()
+def jobs_dir(tmp_path, monkeypatch):
+    d = tmp_path / "jobs"
+    monkeypatch.setattr(jobs_mod, "JOBS_DIR", d)
+    monkeypatch.setattr(jobs_mod, "_queue", None)
+    return d
+
+
+@pytest.fixture()
+def live_client(client, jobs_dir):
+    # Kontextmanager startet den Lifespan und damit die Job-Worker
+    with TestClient(client.app) as c:
+        yield c
+
+
+def wait_for_job(client, url, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = client.get(url, headers=HEADERS)
+        if resp.status_code != 202:
+            return resp
+        time.sleep(0.02)
+    raise AssertionError("Job nicht rechtzeitig fertig")
+
+
+# ── JobQueue ─────────────────────────────────────────────────────────────────
+
+def test_queue_claims_in_order(tmp_path):
+    queue = JobQueue(tmp_path)
+    first = queue.submit({"titel": "1"})
+    second = queue.submit({"titel": "2"})
+    assert queue.claim() == (first, {"titel": "1"})
+    assert queue.claim() == (second, {"titel": "2"})
+    assert queue.claim() is None
+    assert queue.get(first)["status"] == "running"
+
+
+def test_queue_recovers_expired_leases(tmp_path):
+    queue = JobQueue(tmp_path, lease=0)
+    job_id = queue.submit({"titel": "X"})
+    queue.claim()
+    time.sleep(0.01)
+    # Neustart: neue Instanz auf demselben Verzeichnis
+    restarted = JobQueue(tmp_path)
+    assert restarted.recover() == 1
+    assert restarted.claim() == (job_id, {"titel": "X"})
+
+
+def test_queue_keeps_jobs_of_live_process(tmp_path):
+    queue = JobQueue(tmp_path, lease=60)
+    queue.submit({"titel": "X"})
+    queue.claim()
+    other = JobQueue(tmp_path)
+    assert other.recover() == 0
+    assert other.claim() is None
+
+
+def test_expired_lease_is_claimed_by_other_process(tmp_path):
+    queue = JobQueue(tmp_path, lease=0.05)
+    job_id = queue.submit({"titel": "X"})
+    queue.claim()
+    queue.renew()
+    other = JobQueue(tmp_path)
+    assert other.claim() is None
+    time.sleep(0.1)
+    assert other.claim() == (job_id, {"titel": "X"})
+    assert other.get(job_id)["owner"] == other.owner
+
+
+def test_queue_expires_after_ttl(tmp_path):
+    queue = JobQueue(tmp_path, ttl=0)
+    job_id = queue.submit({})
+    queue.claim()
+    queue.complete(job_id, b"png")
+    time.sleep(0.01)
+    assert queue.get(job_id) is None
+    queue.cleanup()
+    assert not queue.result_path(job_id).exists()
+
+
+def test_queue_enforces_size_cap(tmp_path):
+    queue = JobQueue(tmp_path, max_bytes=10)
+    ids = []
+    for _ in range(3):
+        job_id = queue.submit({})
+        queue.claim()
+        queue.complete(job_id, b"x" * 4)
+        ids.append(job_id)
+        time.sleep(0.01)
+    queue.cleanup()
+    assert queue.get(ids[0]) is None
+    assert queue.get(ids[1]) is not None
+    assert queue.get(ids[2]) is not None
+
+
+def test_workers_process_queue(tmp_path):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit({"titel": "Worker", "breite": 160})
+    workers = JobWorkers(queue, 1)
+    workers.start()
+    try:
+        deadline = time.monotonic() + 10
+        while queue.get(job_id)["status"] != "done" and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        workers.stop()
+    assert queue.result_path(job_id).read_bytes()[:4] == b"\x89PNG"
+
+
+def test_claim_reports_lock_error_not_rollback_error(tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path)
+    queue.submit({"titel": "X"})
+
+    def impatient_connect():
+        db = sqlite3.connect(tmp_path / "jobs.sqlite3", timeout=0.05, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    monkeypatch.setattr(queue, "_connect", impatient_connect)
+    blocker = impatient_connect()
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            queue.claim()
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+
+def test_heartbeat_cleans_up_without_new_jobs(tmp_path):
+    queue = JobQueue(tmp_path, ttl=0, lease=0.03)
+    job_id = queue.submit({})
+    queue.claim()
+    queue.complete(job_id, b"png")
+    workers = JobWorkers(queue, 0)
+    workers.start()
+    try:
+        deadline = time.monotonic() + 5
+        while queue.result_path(job_id).exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        workers.stop()
+    assert not queue.result_path(job_id).exists()
+
+
+def test_worker_survives_queue_errors(tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit({"titel": "Worker", "breite": 160})
+    real_claim = queue.claim
+    calls = []
+
+    def flaky_claim():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim()
+
+    monkeypatch.setattr(queue, "claim", flaky_claim)
+    monkeypatch.setattr(jobs_mod, "_POLL_INTERVAL", 0.01)
+    workers = JobWorkers(queue, 1)
+    workers.start()
+    try:
+        deadline = time.monotonic() + 10
+        while queue.get(job_id)["status"] != "done" and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        workers.stop()
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_failed_result_write_marks_job_failed(tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit({"titel": "Voll", "breite": 160})
+
+    def disk_full(job_id, data):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(queue, "complete", disk_full)
+    assert JobWorkers(queue, 1)._step() is True
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "No space left" in job["error"]
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+def test_jobs_require_key(live_client):
+    assert live_client.post("/jobs", json={"titel": "X"}).status_code == 401
+    assert live_client.get("/jobs/abc").status_code == 401
+
+
+def test_job_roundtrip(live_client):
+    resp = live_client.post(
+        "/jobs", json={"titel": "Job", "breite": 320, "dateiname": "job.png"}, headers=HEADERS,
+    )
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["status"] == "queued"
+    assert resp.headers["location"] == body["url"]
+
+    result = wait_for_job(live_client, body["url"])
+    assert result.status_code == 200
+    assert result.content[:4] == b"\x89PNG"
+    assert 'filename="job.png"' in result.headers["content-disposition"]
+
+
+def test_svg_job_roundtrip(live_client, jobs_dir):
+    resp = live_client.post("/jobs", json={"titel": "Job", "breite": 320, "format": "svg"}, headers=HEADERS)
+    job_id = resp.json()["id"]
+    result = wait_for_job(live_client, resp.json()["url"])
+    assert result.headers["content-type"].startswith("image/svg+xml")
+    assert f'filename="{job_id}.svg"' in result.headers["content-disposition"]
+    assert not list((jobs_dir / "results").glob("*.png"))
+
+
+def test_job_failure_is_reported(live_client):
+    resp = live_client.post(
+        "/jobs", json={"titel": "X", "breite": 160, "hintergrund": "notacolor!!!"}, headers=HEADERS,
+    )
+    result = wait_for_job(live_client, resp.json()["url"])
+    assert result.status_code == 200
+    assert result.json()["status"] == "failed"
+    assert result.json()["error"]
+
+
+def test_unknown_job_is_404(live_client):
+    assert live_client.get("/jobs/unbekannt", headers=HEADERS).status_code == 404
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from title_image_service.cli import run
+from title_image_service.loadtest import load_payloads, percentile, run_loadtest
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_load_payloads_reads_weights(tmp_path):
+    f = tmp_path / "mix.jsonl"
+    f.write_text('{"titel": "A", "_weight": 3}\n\n{"titel": "B"}\n', encoding="utf-8")
+    assert load_payloads(f) == [({"titel": "A"}, 3.0), ({"titel": "B"}, 1.0)]
+
+
+def test_load_payloads_rejects_empty_file(tmp_path):
+    f = tmp_path / "leer.jsonl"
+    f.write_text("\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_payloads(f)
+
+
+@pytest.mark.parametrize("argv", [
+    ["--label", "foo"],
+    ["--payloads", "{empty}"],
+    ["--payloads", "{missing}"],
+])
+def test_cli_loadtest_rejects_invalid_arguments(tmp_path, capsys, argv):
+    (tmp_path / "leer.jsonl").write_text("", encoding="utf-8")
+    argv = [a.format(empty=tmp_path / "leer.jsonl", missing=tmp_path / "fehlt.jsonl") for a in argv]
+    with pytest.raises(SystemExit) as exc:
+        run(["loadtest", *argv])
+    assert exc.value.code == 2
+    assert "error:" in capsys.readouterr().err
+
+
+def test_run_loadtest_in_process(client, tmp_path):
+    f = tmp_path / "mix.jsonl"
+    f.write_text(
+        '{"titel": "Klein", "breite": 160}\n'
+        '{"titel": "Kaputt", "breite": 160, "hintergrund": "notacolor!!!"}\n',
+        encoding="utf-8",
+    )
+    report = run_loadtest(
+        payloads=f, requests=12, concurrency=3, api_key="sk-valid",
+        threads=2, labels={"variante": "test"},
+    )
+    assert report["requests"] == 12
+    assert set(report["status"]) <= {"200", "422"}
+    assert report["errors"] == report["status"].get("422", 0)
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"] <= report["latency_ms"]["max"]
+    assert "encode" in report["server_timing_mean_ms"]
+    assert report["config"]["threads"] == 2
+    assert report["config"]["labels"] == {"variante": "test"}
+
+
+def test_run_loadtest_in_process_runs_lifespan(client, tmp_path, monkeypatch):
+    import title_image_service.jobs as jobs_mod
+    import title_image_service.main as main_mod
+
+    calls = []
+    monkeypatch.setenv("WARMUP", "true")
+    monkeypatch.setattr(main_mod, "warm_up", lambda: calls.append("warm_up"))
+    monkeypatch.setattr(jobs_mod, "JOBS_WORKERS", 2)
+    monkeypatch.setattr(jobs_mod, "JobWorkers", None)  # darf nicht gestartet werden
+    f = tmp_path / "mix.jsonl"
+    f.write_text('{"titel": "Lifespan", "breite": 160}\n', encoding="utf-8")
+    report = run_loadtest(payloads=f, requests=2, concurrency=1, api_key="sk-valid")
+    assert report["errors"] == 0
+    assert calls == ["warm_up"]
+    assert jobs_mod.JOBS_WORKERS == 2
+
+
+def test_cli_loadtest_prints_json(client, tmp_path, capsys):
+    f = tmp_path / "mix.jsonl"
+    f.write_text('{"titel": "CLI", "breite": 160}\n', encoding="utf-8")
+    rc = run(["loadtest", "--payloads", str(f), "-n", "4", "-c", "2", "--api-key", "sk-valid"])
+    assert rc == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["errors"] == 0
@@ -0,0 +1,111 @@
+import json
+import logging
+import logging.handlers
+
+import title_image_service.logs as logs_mod
+
+GENERATOR_LOGGER = "title_image_service.generator"
+
+
+def render_summaries(caplog):
+    return [r.summary for r in caplog.records if getattr(r, "summary", None)]
+
+
+# ── Zusammenfassung pro Request ──────────────────────────────────────────────
+
+def test_generate_logs_one_summary(client, caplog, monkeypatch):
+    monkeypatch.setattr(logs_mod, "LOG_VERBOSE_SAMPLE_RATE", 0)
+    caplog.set_level(logging.INFO)
+    resp = client.post(
+        "/generate",
+        json={"titel": "Log", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    assert resp.status_code == 200
+    [summary] = render_summaries(caplog)
+    assert summary["endpoint"] == "/generate"
+    assert summary["status"] == 200
+    assert summary["bytes"] == len(resp.content)
+    assert summary["font_source"] in {"system", "cache", "google", "fallback", "default"}
+    assert set(summary["timings"]) == {"font", "fit", "wrap", "draw", "encode"}
+    assert summary["verbose"] is False
+    # Phasen-Logs des Generators bleiben unterhalb von INFO
+    assert not [r for r in caplog.records if r.name == GENERATOR_LOGGER and r.levelno == logging.INFO]
+
+
+def test_generate_error_logs_summary_with_status(client, caplog):
+    caplog.set_level(logging.INFO)
+    client.post(
+        "/generate",
+        json={"titel": "X", "breite": 160, "hintergrund": "notacolor!!!"},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    [summary] = render_summaries(caplog)
+    assert summary["status"] == 422
+
+
+def test_job_logs_one_summary(tmp_path, caplog):
+    from title_image_service.jobs import JobQueue, JobWorkers
+
+    caplog.set_level(logging.INFO)
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit({"titel": "Job", "breite": 160, "format": "svg"})
+    assert JobWorkers(queue, 1)._step() is True
+    [summary] = render_summaries(caplog)
+    assert summary["endpoint"] == "/jobs"
+    assert summary["job"] == job_id
+    assert summary["status"] == 200
+    assert summary["format"] == "svg"
+    assert summary["bytes"] == queue.result_path(job_id).stat().st_size
+    assert set(summary["timings"]) == {"font", "fit", "wrap", "draw", "encode"}
+
+
+def test_sampled_request_logs_stages_at_info(client, caplog, monkeypatch):
+    monkeypatch.setattr(logs_mod, "LOG_VERBOSE_SAMPLE_RATE", 1)
+    caplog.set_level(logging.INFO)
+    client.post(
+        "/generate",
+        json={"titel": "Verbose", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    assert render_summaries(caplog)[0]["verbose"] is True
+    assert [r for r in caplog.records if r.name == GENERATOR_LOGGER and r.levelno == logging.INFO]
+
+
+# ── Formatter / Pipeline ─────────────────────────────────────────────────────
+
+def test_json_formatter_flattens_summary():
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "%s", ("ignoriert",), None)
+    record.summary = {"event": "render", "ms": 1.5}
+    entry = json.loads(logs_mod.JsonFormatter().format(record))
+    assert entry["event"] == "render"
+    assert entry["ms"] == 1.5
+    assert entry["level"] == "INFO"
+    assert "msg" not in entry
+
+
+def test_lifespan_configures_logging_without_handlers(client, monkeypatch):
+    import title_image_service.jobs as jobs_mod
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(jobs_mod, "JOBS_WORKERS", 0)
+    monkeypatch.setenv("WARMUP", "false")
+    root = logging.getLogger()
+    root.handlers[:] = []
+    root.setLevel(logging.WARNING)
+    with TestClient(client.app):
+        [handler] = root.handlers
+        assert isinstance(handler, logging.handlers.QueueHandler)
+        assert root.isEnabledFor(logging.INFO)
+
+
+def test_configure_logging_uses_queue(capsys, monkeypatch):
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    logs_mod.configure_logging("INFO")
+    [handler] = logging.getLogger().handlers
+    assert isinstance(handler, logging.handlers.QueueHandler)
+
+    logs_mod.summary(logging.getLogger("test"), {"event": "probe"})
+    logs_mod.shutdown_logging()
+    line = capsys.readouterr().err.strip().splitlines()[-1]
+    assert json.loads(line)["event"] == "probe"
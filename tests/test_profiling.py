@@ -0,0 +1,163 @@
+import json
+import pstats
+import threading
+
+import pytest
+
+import title_image_service.profiling as profiling_mod
+from title_image_service.generator import STAGES, generate_image
+
+
+@pytest.fixture()
+def profile_dir(tmp_path, monkeypatch):
+    d = tmp_path / "profiles"
+    monkeypatch.setattr(profiling_mod, "PROFILE_DIR", d)
+    return d
+
+
+@pytest.fixture()
+def admin_keys(keys_file):
+    keys_file.write_text(json.dumps({"keys": ["sk-valid"], "admin_keys": ["sk-admin"]}))
+    return keys_file
+
+
+# ── Phasen-Timings / Server-Timing ───────────────────────────────────────────
+
+def test_generate_image_reports_stage_timings():
+    stats = {}
+    generate_image({"titel": "Timing", "text": "mit Text", "breite": 320}, None, stats)
+    assert tuple(stats["timings"]) == STAGES
+    assert all(ms >= 0 for ms in stats["timings"].values())
+
+
+def test_server_timing_header_format():
+    header = profiling_mod.server_timing_header({"font": 1.23, "fit": 4.0}, total_ms=6.5)
+    assert header == "font;dur=1.2, fit;dur=4.0, total;dur=6.5"
+
+
+def test_generate_response_has_server_timing(client):
+    resp = client.post(
+        "/generate",
+        json={"titel": "Test", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    assert resp.status_code == 200
+    names = [part.split(";")[0] for part in resp.headers["server-timing"].split(", ")]
+    assert names == [*STAGES, "total"]
+
+
+def test_error_response_has_server_timing(client):
+    resp = client.post(
+        "/generate",
+        json={"titel": "Test", "breite": 320, "hintergrund": "notacolor!!!"},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    assert resp.status_code == 422
+    names = [part.split(";")[0] for part in resp.headers["server-timing"].split(", ")]
+    assert names == [*STAGES, "total"]
+
+
+# ── Profiling ────────────────────────────────────────────────────────────────
+
+def test_run_profiled_disabled_writes_nothing(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiling_mod, "PROFILE_SLOW_MS", 0)
+    assert profiling_mod.run_profiled(lambda x: x * 2, 21) == 42
+    assert not profile_dir.exists()
+
+
+def test_run_profiled_sampled_writes_cprofile(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 1)
+    profiling_mod.run_profiled(generate_image, {"titel": "P", "breite": 160}, None)
+    [entry] = profiling_mod.list_profiles()
+    assert entry["name"].endswith(".prof")
+    pstats.Stats(str(profile_dir / entry["name"]))
+
+
+def test_run_profiled_slow_writes_stacks(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiling_mod, "PROFILE_SLOW_MS", 0.001)
+
+    def slow():
+        import time
+        time.sleep(0.05)
+
+    profiling_mod.run_profiled(slow)
+    [entry] = profiling_mod.list_profiles()
+    assert entry["name"].endswith(".folded")
+    assert "slow" in (profile_dir / entry["name"]).read_text()
+
+
+def test_concurrent_sampled_requests_succeed(client, profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def held():
+        started.set()
+        release.wait(5)
+
+    # Ein laufendes cProfile blockiert den zweiten Aufruf (wie unter Python 3.12)
+    blocker = threading.Thread(target=profiling_mod.run_profiled, args=(held,))
+    blocker.start()
+    started.wait(5)
+    try:
+        resp = client.post(
+            "/generate",
+            json={"titel": "Parallel", "breite": 320},
+            headers={"X-API-Key": "sk-valid"},
+        )
+    finally:
+        release.set()
+        blocker.join()
+    assert resp.status_code == 200
+    kinds = sorted(e["name"].rsplit(".", 1)[1] for e in profiling_mod.list_profiles())
+    assert kinds == ["folded", "prof"]
+
+
+def test_profiler_setup_error_does_not_reach_caller(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 1)
+
+    class Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling_mod.cProfile, "Profile", Busy)
+    assert profiling_mod.run_profiled(lambda x: x * 2, 21) == 42
+    assert not profiling_mod._cprofile_lock.locked()
+
+
+def test_profile_ring_is_bounded(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 1)
+    monkeypatch.setattr(profiling_mod, "PROFILE_MAX_FILES", 3)
+    for _ in range(5):
+        profiling_mod.run_profiled(sum, [1, 2])
+    assert len(profiling_mod.list_profiles()) == 3
+
+
+# ── Admin-Endpunkte ──────────────────────────────────────────────────────────
+
+def test_admin_profiles_requires_admin_key(client, admin_keys, profile_dir):
+    assert client.get("/admin/profiles").status_code == 401
+    resp = client.get("/admin/profiles", headers={"X-API-Key": "sk-valid"})
+    assert resp.status_code == 401
+
+
+def test_admin_profiles_list_and_download(client, admin_keys, profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling_mod, "PROFILE_SAMPLE_RATE", 1)
+    client.post(
+        "/generate",
+        json={"titel": "Test", "breite": 320},
+        headers={"X-API-Key": "sk-valid"},
+    )
+    headers = {"X-API-Key": "sk-admin"}
+    [entry] = client.get("/admin/profiles", headers=headers).json()["profiles"]
+    resp = client.get(f"/admin/profiles/{entry['name']}", headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.content) == entry["bytes"]
+
+
+def test_admin_profile_rejects_unknown_name(client, admin_keys, profile_dir):
+    headers = {"X-API-Key": "sk-admin"}
+    assert client.get("/admin/profiles/..%2Fapi_keys.json", headers=headers).status_code == 404
+    assert client.get("/admin/profiles/missing.prof", headers=headers).status_code == 404
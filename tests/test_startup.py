@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+# Großzügiges Default-Budget für CI; enger messen mit scripts/bench_startup.py
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "2000"))
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": ms, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def test_cli_import_is_lightweight():
+    result = probe("title_image_service.cli")
+    loaded = set(result["modules"])
+    assert not {"fastapi", "PIL", "uvicorn", "pydantic"} & loaded
+    assert result["ms"] <= STARTUP_BUDGET_MS
+
+
+def test_app_import_defers_pillow():
+    result = probe("title_image_service.main")
+    loaded = set(result["modules"])
+    assert "PIL" not in loaded
+    assert "urllib.request" not in loaded
+    assert result["ms"] <= STARTUP_BUDGET_MS
+
+
+def test_app_import_does_not_configure_logging():
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import logging, title_image_service.main; print(len(logging.getLogger().handlers))"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert out.strip() == "0"
+
+
+def test_batch_import_defers_pillow():
+    assert "PIL" not in probe("title_image_service.batch")["modules"]
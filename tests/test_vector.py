@@ -0,0 +1,105 @@
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import title_image_service.generator as generator_mod
+import title_image_service.vector as vector_mod
+from title_image_service.generator import generate_image
+from title_image_service.models import ImageRequest
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+HEADERS = {"X-API-Key": "sk-valid"}
+
+
+def render(**data) -> ET.Element:
+    svg = generate_image({"titel": "Vektor", "text": "Untertitel <&>", "format": "svg", **data})
+    return ET.fromstring(svg)
+
+
+def test_svg_has_size_and_colors():
+    root = render(breite=640, vordergrund="gelb", hintergrund="#123456")
+    assert root.get("width") == "640"
+    assert root.get("height") == "360"
+    assert root.get("viewBox") == "0 0 640 360"
+    assert root.find(f"{SVG_NS}rect").get("fill") == "#123456"
+    assert root.find(f"{SVG_NS}g").get("fill") == "#ffff00"
+
+
+def test_svg_text_fallback_without_fonttools(monkeypatch):
+    monkeypatch.setattr(vector_mod, "has_outlines", lambda: False)
+    root = render(breite=640)
+    texts = [t.text for t in root.iter(f"{SVG_NS}text")]
+    assert texts == ["Vektor", "Untertitel <&>"]
+
+
+def test_svg_outlines_with_fonttools():
+    pytest.importorskip("fontTools")
+    root = render(breite=640)
+    if root.find(f"{SVG_NS}text") is not None:
+        pytest.skip("Kein Outline-fähiger Font verfügbar")
+    assert root.find(f"{SVG_NS}defs/{SVG_NS}path") is not None
+    assert list(root.iter(f"{SVG_NS}use"))
+
+
+def test_svg_outlines_identical_across_threads():
+    pytest.importorskip("fontTools")
+    from PIL import ImageFont
+
+    font_path, _, _ = generator_mod.resolve_font_source("Rubik Glitch")
+    if font_path is None:
+        pytest.skip("Kein Outline-fähiger Font verfügbar")
+    font = ImageFont.truetype(font_path, 48)
+    lines = [("Parallel gerendert: äöüß 0123456789", font, 10, 10), ("Gleiche Bytes", font, 10, 80)]
+    threads = 16
+    barrier = threading.Barrier(threads)
+
+    def render(_):
+        barrier.wait()
+        return vector_mod.render_svg(640, 360, (255, 255, 255), (0, 0, 0), font_path, lines)
+
+    for _ in range(5):
+        # Frisch geladener TTFont: Tabellen werden erst beim ersten Zugriff gelesen
+        vector_mod._load_ttfont.cache_clear()
+        with ThreadPoolExecutor(threads) as pool:
+            outputs = set(pool.map(render, range(threads)))
+        assert len(outputs) == 1
+        assert "@font-face" not in outputs.pop()
+
+
+def test_svg_cost_independent_of_width():
+    assert len(generate_image({"titel": "Breite", "format": "svg", "breite": 4096})) < 2 * len(
+        generate_image({"titel": "Breite", "format": "svg", "breite": 640})
+    )
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        generate_image({"titel": "X", "format": "gif"})
+
+
+def test_generate_svg_endpoint(client):
+    resp = client.post(
+        "/generate",
+        json={"titel": "SVG", "breite": 320, "format": "svg"},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("image/svg+xml")
+    assert resp.headers["content-disposition"].endswith('.svg"')
+    assert resp.content.startswith(b"<?xml")
+
+
+def test_svg_image_url_uses_format_extension(client):
+    request = ImageRequest(titel="SVG", breite=320, format="svg")
+    assert request.content_hash() != ImageRequest(titel="SVG", breite=320).content_hash()
+    resp = client.post("/generate?redirect=true", json=request.model_dump(), headers=HEADERS,
+                       follow_redirects=False)
+    location = resp.headers["location"]
+    assert f"/images/{request.content_hash()}.svg" in location
+
+    image = client.get(location, headers=HEADERS)
+    assert image.status_code == 200
+    assert image.headers["content-type"].startswith("image/svg+xml")
+    assert client.get(location.replace(".svg", ".png"), headers=HEADERS).status_code == 404